@@ -1,16 +1,381 @@
 import asyncio
+import copy
+import errno
+import functools
 import json
 import os
+import pickle
+import random
 import re
 import signal
 import sys
+import time
+from collections import Counter
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-from playwright.async_api import Browser, Page, async_playwright
+import orjson
+from playwright.async_api import Browser, Download, Page, async_playwright
 from playwright.async_api import TimeoutError as PlaywrightTimeout
 
+# Pola regex di-compile sekali saat module load
+# Pola berisi \d di bawah pakai re.ASCII: hanya digit ASCII, tanpa lookup tabel Unicode
+# Nama file download: 192.168.88.19_001_20250129004231A1B2.mp4
+# Groups: IP, channel, YYYY, MM, DD, HH, mm, ss, hex
+_FNAME_RE = re.compile(
+    r"^(\d+\.\d+\.\d+\.\d+)_(\d{3})_(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})([A-F0-9]{4})\.mp4$",
+    re.ASCII,
+)
+# Resource statis yang tidak dibutuhkan scraper (gambar/font), di-block di context.
+# Hanya URL yang cocok yang lewat handler Python; XHR/script/CSS/download tidak tersentuh
+_BLOCKED_RESOURCE_RE = re.compile(r"\.(?:png|jpe?g|gif|svg|ico|webp|bmp|woff2?|ttf|otf|eot)(?:\?.*)?$", re.I)
+# Label channel di dropdown: "[1] Camera 01"
+_CH_LABEL_RE = re.compile(r"^\[(\d+)\]", re.ASCII)
+# Progress dialog download: "... (3/20)"
+_PROGRESS_RE = re.compile(r"\((\d+)/(\d+)\)", re.ASCII)
+# Hasil download di alert/toast: "Success 18, Failure 2"
+_SUCCESS_RE = re.compile(r"Success (\d+)", re.ASCII)
+_FAILURE_RE = re.compile(r"Failure (\d+)", re.ASCII)
+# Predicate: checkbox header dan semua checkbox baris tabel sudah checked
+# (selector :not(:checked) berhenti di match pertama, tanpa materialisasi semua baris)
+_ALL_CHECKED_JS = """() => {
+    const header = document.querySelector('div.td-table-header input.checkbox');
+    return !!(header && header.checked)
+        && !!document.querySelector('div.td-table-body input.checkbox')
+        && !document.querySelector('div.td-table-body input.checkbox:not(:checked)');
+}"""
+# Klik checkbox header lalu cek hasilnya (satu evaluate)
+_SELECT_ALL_JS = (
+    """() => {
+    const checkbox = document.querySelector('div.td-table-header input.checkbox');
+    if (!checkbox) return {found: false, checked: false, allChecked: false};
+    checkbox.click();
+    return {found: true, checked: checkbox.checked, allChecked: ("""
+    + _ALL_CHECKED_JS
+    + """)()};
+}"""
+)
+# Set checkbox setiap baris: checked hanya untuk index di indices, return jumlah yang checked
+_SELECT_ROWS_JS = """(indices) => {
+    const wanted = new Set(indices);
+    let selected = 0;
+    document.querySelectorAll('div.td-table-body div.td-table-row').forEach((row, index) => {
+        const checkbox = row.querySelector('input.checkbox');
+        if (!checkbox) return;
+        if (checkbox.checked !== wanted.has(index)) checkbox.click();
+        if (checkbox.checked) selected++;
+    });
+    return selected;
+}"""
+# Kolom tabel hasil query (cell index 1-5)
+_TABLE_FIELDS = ("channel", "startTime", "endTime", "type", "lock")
+_NON_DIGIT_RE = re.compile(r"\D")
+# Log progress berulang yang tidak perlu di-print ke stdout
+_QUIET_LOG_RE = re.compile(r"\[\*\] Downloaded \d+/\d+ files")
+
+# Umur maksimal cache daftar channel (detik)
+CHANNELS_CACHE_TTL = 24 * 60 * 60
+# Umur maksimal storage state Playwright yang dipakai ulang saat startup (detik)
+SESSION_STATE_TTL = 10 * 60
+
+# Jumlah page (tab) di satu browser context yang memproses channel/halaman secara paralel
+CHANNEL_WORKERS = int(os.getenv("PLAYBACK_CHANNEL_WORKERS", "4"))
+# Jumlah channel yang boleh berjalan bersamaan (halamannya berbagi worker pool)
+CHANNEL_CONCURRENCY = int(os.getenv("PLAYBACK_CHANNEL_CONCURRENCY", "2"))
+
+# Timeout download per halaman: base + per file di halaman tersebut
+BASE_TIMEOUT_MS = int(os.getenv("PLAYBACK_BASE_TIMEOUT_MS", "30000"))
+PER_FILE_MS = int(os.getenv("PLAYBACK_PER_FILE_MS", "20000"))
+# Batas bawah timeout per halaman, supaya env yang terlalu kecil tidak memutus download normal
+MIN_PAGE_TIMEOUT_MS = 120000
+
+# Snapshot DB ditulis compact; set PLAYBACK_DB_PRETTY=1 untuk indent 2 spasi (debug)
+DB_DUMP_OPTION = orjson.OPT_INDENT_2 if os.getenv("PLAYBACK_DB_PRETTY") == "1" else 0
+
+# Predicate: dialog download sudah tidak sibuk (dialog tertutup atau tombol Stop disabled)
+_DL_IDLE_JS = """() => {
+    const dialog = document.getElementById('playback_down_dialog');
+    const stopBtn = document.getElementById('playback_down_stop');
+    return !(dialog && dialog.style.display !== 'none') || !!(stopBtn && stopBtn.hasAttribute('disabled'));
+}"""
+
+# Snapshot status dialog download: semua elemen yang dicek saat menunggu
+# download dibaca dalam satu evaluate (satu round-trip CDP)
+# Referensi elemen di-cache di window.__pdEls (hilang sendiri saat navigasi);
+# elemen yang sudah dilepas dari DOM (isConnected false) atau belum ada di-lookup ulang
+_DL_STATUS_JS = """() => {
+    const cache = window.__pdEls || (window.__pdEls = {});
+    const byId = (id) => {
+        let el = cache[id];
+        if (!el || !el.isConnected) el = cache[id] = document.getElementById(id);
+        return el;
+    };
+    const infoElem = byId('playback_down_info');
+    const stopBtn = byId('playback_down_stop');
+    const progressBar = byId('playback_down_progress');
+    const alertElem = byId('info_');
+    const showbox = byId('showbox');
+    const dialog = byId('playback_down_dialog');
+    const toast = document.querySelector('.el-message__content');
+    const showboxText = showbox ? showbox.textContent.trim() : null;
+    const alertElemText = alertElem ? alertElem.textContent.trim() : null;
+
+    return {
+        infoText: infoElem ? infoElem.textContent.trim() : null,
+        stopBtnExists: stopBtn ? true : false,
+        stopBtnDisabled: stopBtn ? stopBtn.hasAttribute('disabled') : false,
+        dialogVisible: !!(dialog && dialog.style.display !== 'none'),
+        progressWidth: progressBar ? progressBar.style.width : null,
+        alertVisible: alertElem ? alertElem.style.display !== 'none' : false,
+        alertText: showboxText,
+        // Toast (element-plus/el-message), fallback ke showbox/info_
+        toastText: (toast && toast.textContent.trim()) || showboxText || alertElemText || null,
+        // Logo user hanya ada saat login (sama dengan check_session)
+        loggedIn: !!byId('main_user_logo')
+    };
+}"""
+
+# Baca baris tabel hasil query sebagai array (cell index 1-5, lihat _TABLE_FIELDS)
+_READ_ROWS_JS = """() => Array.from(
+    document.querySelectorAll('div.td-table-body div.td-table-row'),
+    row => {
+        const c = row.querySelectorAll('span.td-table-cell');
+        return [1, 2, 3, 4, 5].map(i => c[i]?.textContent?.trim() || '');
+    }
+)"""
+
+# Snapshot tabel hasil sebelum query: tandai baris lama (data-pd-stale) dan catat
+# jumlah halaman + teks baris pertama, supaya hasil query sebelumnya tidak terbaca ulang
+_TABLE_SNAPSHOT_JS = """() => {
+    const rows = document.querySelectorAll('div.td-table-body div.td-table-row');
+    rows.forEach(row => { row.dataset.pdStale = '1'; });
+    return {
+        count: (document.getElementById('playback_pagecount')?.textContent || '').trim(),
+        first: rows.length ? rows[0].textContent.trim() : '',
+        rows: rows.length
+    };
+}"""
+# Predicate: tabel sudah berisi hasil query baru (baris lama hilang atau isi berubah)
+_TABLE_CHANGED_JS = """(prev) => {
+    const body = document.querySelector('div.td-table-body');
+    if (!body) return false;
+    const rows = body.querySelectorAll('div.td-table-row');
+    const count = (document.getElementById('playback_pagecount')?.textContent || '').trim();
+    if (rows.length && count === '') return false;
+    if (prev.rows > 0 && !body.querySelector('div.td-table-row[data-pd-stale]')) return true;
+    return count !== prev.count
+        || rows.length !== prev.rows
+        || (rows.length ? rows[0].textContent.trim() : '') !== prev.first;
+}"""
+
+# Pagination dijalankan di browser: kumpulkan baris semua halaman dalam satu evaluate.
+# Berhenti lebih awal jika halaman tidak berganti dalam 10 detik.
+_ALL_PAGES_JS = (
+    """async (total) => {
+    const readRows = """
+    + _READ_ROWS_JS
+    + """;
+    const isOnPage = (p) => {
+        const cur = document.getElementById('playback_pagecur');
+        return !!cur && parseInt(cur.textContent) === p;
+    };
+    const waitForPage = (p) => new Promise((resolve) => {
+        if (isOnPage(p)) return resolve(true);
+        const timer = setTimeout(() => { obs.disconnect(); resolve(false); }, 10000);
+        const obs = new MutationObserver(() => {
+            if (isOnPage(p)) {
+                clearTimeout(timer);
+                obs.disconnect();
+                resolve(true);
+            }
+        });
+        obs.observe(document.body, {childList: true, subtree: true, characterData: true});
+    });
+
+    const pages = [readRows()];
+    for (let p = 2; p <= total; p++) {
+        document.getElementById('playback_jump_page').value = p;
+        document.getElementById('playback_jump').click();
+        if (!(await waitForPage(p))) break;
+        // Beri satu frame supaya baris tabel ikut ter-render
+        await new Promise(r => requestAnimationFrame(r));
+        pages.push(readRows());
+    }
+    return pages;
+}"""
+)
+
+# Init script: MutationObserver menulis window.__dl hanya saat status berubah
+# dan mem-push snapshot ke Python lewat binding window.__pdStatus
+_DL_OBSERVER_JS = (
+    """(() => {
+    const read = """
+    + _DL_STATUS_JS
+    + """;
+    const update = () => {
+        const next = read();
+        const key = JSON.stringify(next);
+        if (key === window.__dlKey) return;
+        window.__dlKey = key;
+        next.seq = (window.__dl ? window.__dl.seq : 0) + 1;
+        window.__dl = next;
+        if (window.__pdStatus) window.__pdStatus(next);
+    };
+    const start = () => {
+        update();
+        new MutationObserver(update).observe(document.documentElement, {
+            childList: true,
+            subtree: true,
+            characterData: true,
+            attributes: true,
+            attributeFilter: ['style', 'disabled']
+        });
+    };
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start);
+    } else {
+        start();
+    }
+})();"""
+)
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_download_name(filename: str) -> Optional[Tuple[int, str]]:
+    """Parse nama file download dari DVR (di-cache, nama yang sama sering dicek ulang)
+    Returns:
+        (channel_num, nama file terorganisir) atau None jika format tidak dikenali
+    """
+    # Reject murah sebelum regex: harus .mp4 dengan minimal 2 underscore
+    if not filename.endswith(".mp4") or filename.count("_") < 2:
+        return None
+
+    # Parse filename: 192.168.88.19_001_20250129004231A1B2.mp4
+    # Format: IP_CHANNEL_STARTTIME<HEX>.mp4
+    # Time format: YYYYMMDDHHmmss, semua komponen diambil dalam satu match
+    full_match = _FNAME_RE.match(filename)
+    if not full_match:
+        return None
+
+    # Extract components (random hex tidak dipakai)
+    (
+        _ip,
+        channel,
+        start_year,
+        start_month,
+        start_day,
+        start_hour,
+        start_minute,
+        start_second,
+        _hex,
+    ) = full_match.groups()
+
+    # Format: YYYY-MM-DD.HH-mm-ss.mp4
+    date_str = f"{start_year}-{start_month}-{start_day}"
+    start_formatted = f"{start_hour}-{start_minute}-{start_second}"
+    return int(channel), f"{date_str}.{start_formatted}.mp4"
+
+
+@functools.lru_cache(maxsize=8192)
+def _organized_target(filename: str) -> Optional[Tuple[int, str]]:
+    """Channel dan nama file terorganisir untuk kedua format nama download
+    Returns:
+        (channel_num, nama file terorganisir) atau None jika format tidak dikenali
+    """
+    # Format download DVR (IP_CH_STARTHEX.mp4), sama dengan organizer
+    parsed = _parse_download_name(filename)
+    if parsed:
+        return parsed
+
+    # Format rentang waktu: 192.168.88.19_1_20250129143000_20250129144500.mp4
+    # (IP_CH_START_END.mp4, tepat 3 underscore). Layout tetap, jadi cukup split + slice
+    if not filename.endswith(".mp4") or filename.count("_") != 3:
+        return None
+    ip, channel, start, end = filename[:-4].split("_")
+    if not (
+        len(start) == 14
+        and len(end) == 14
+        and _is_ascii_digits(start)
+        and _is_ascii_digits(end)
+        and _is_ascii_digits(channel)
+        and ip.count(".") == 3
+        and all(map(_is_ascii_digits, ip.split(".")))
+    ):
+        return None
+
+    # Waktu selesai tidak dipakai untuk nama file terorganisir
+    return int(channel), (
+        f"{start[:4]}-{start[4:6]}-{start[6:8]}.{start[8:10]}-{start[10:12]}-{start[12:14]}.mp4"
+    )
+
+
+def _is_ascii_digits(text: str) -> bool:
+    """True jika text tidak kosong dan hanya berisi digit ASCII 0-9"""
+    return text.isascii() and text.isdigit()
+
+
+def _jittered(delay: float) -> float:
+    """Delay polling +-20% supaya beberapa worker tidak polling bersamaan"""
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _replace_and_size(src: str, dst: Path) -> int:
+    """Pindahkan src ke dst (rename) dan return ukuran file (bytes)"""
+    os.replace(src, dst)
+    return os.stat(dst).st_size
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """Tulis data ke path secara atomic (blocking, jalankan di thread)
+    File .tmp di-fsync sebelum os.replace, jadi crash di tengah write
+    meninggalkan file lama yang utuh, bukan JSON terpotong.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _DbJournal:
+    """Handle journal append-only database, satu objek dibagi scraper dan semua worker
+    Rotasi mengganti handle di objek ini, jadi clone worker tidak memegang file yang tertutup
+    """
+
+    def __init__(self):
+        self.file = None
+
+    def open(self, path: Path):
+        """Buka journal append tanpa buffer: satu write() per file baru"""
+        self.close()
+        self.file = open(path, "ab", buffering=0)
+
+    def write(self, data: bytes):
+        if self.file:
+            self.file.write(data)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def rotate(self, path: Path, rotated: Path):
+        """Pindahkan isi journal ke rotated lalu buka journal baru yang kosong
+        Jika rotated masih ada (snapshot sebelumnya gagal), isi journal di-append,
+        bukan menimpa entry yang belum masuk snapshot
+        """
+        self.close()
+        if rotated.exists():
+            with open(rotated, "ab") as old:
+                old.write(path.read_bytes())
+            path.unlink()
+        else:
+            os.replace(path, rotated)
+        self.open(path)
+
 
 class DeviceScraper:
     """Web scraper untuk download playback dari DVR/NVR"""
@@ -25,39 +390,174 @@ class DeviceScraper:
         self.script_dir = Path(__file__).parent
         self.cookie_path = self.script_dir / "cookies.json"
         self.storage_path = self.script_dir / "storage.json"
+        self.session_state_path = self.script_dir / ".playback_session.json"
+        # True jika context dibuat dari session_state_path (cookies + localStorage sudah ada)
+        self._session_preloaded = False
+        # Re-login berurutan antar worker (dibagi dengan worker)
+        self._login_lock = asyncio.Lock()
+        self.query_cache_path = self.script_dir / "query_cache.pkl"
+        self.channels_cache_path = self.script_dir / "channels.json"
         self.download_dir = self.script_dir / "downloads"
         self.organized_dir = Path("/var/cctv")
         self.log_file = Path("/var/log/cctv_scrapper.log")
 
         # Database file - akan di-set sesuai tanggal target download
         self.downloaded_files_db = None
+        self.downloaded_files_journal = None
+        self._db_journal = _DbJournal()
+        self._db_save_lock = asyncio.Lock()
         self.current_download_date = None
 
-        # Download tracking
-        self.pending_downloads = []
-        self.completed_downloads = []
-        # Structure: {"channels": {"1": {"pages": {"1": ["file1.mp4", "file2.mp4"]}}}}
+        # Download tracking (session-wide, dibagi dengan worker)
+        # Structure: {"channels": {"1": {"pages": {"1": {"file1.mp4", "file2.mp4"}}}}}
+        # (set di memory, disimpan sebagai list di file JSON)
         self.downloaded_files_db_data: Dict = {"channels": {}}
-        self.current_download_batch = []  # Track download batch saat ini
+        # Counter inkremental (dibagi dengan worker):
+        # "completed" = file selesai/di-skip session ini, "db_total" = jumlah file di DB,
+        # "db_dirty" = file baru di journal yang belum masuk snapshot JSON
+        self.download_counts: Counter = Counter()
+        # Index waktu mulai file per channel key (dibagi dengan worker), dibangun
+        # sekali per channel di get_downloaded_start_times lalu diupdate di _db_add
+        self._db_start_times: Dict[str, Set[str]] = {}
 
-        # Context tracking - untuk tahu file download dari channel/page mana
-        self.current_channel = None
-        self.current_page = None
+        # State per page/browser context (di-reset untuk setiap worker)
+        self._reset_page_state()
+
+        # Prefix log untuk membedakan worker
+        self.log_prefix = ""
 
         # Create directories
         self.download_dir.mkdir(exist_ok=True)
         self.organized_dir.mkdir(exist_ok=True)
+        # Folder channel yang sudah dipastikan ada (dibagi dengan worker)
+        self._ensured_channels: Set[int] = set()
+        # Path folder per channel, dibuat sekali (dibagi dengan worker)
+        self._channel_dirs: Dict[int, Path] = {}
+        # File terorganisir yang sudah terbukti ada, (channel, nama) (dibagi dengan worker)
+        # Hanya hasil positif yang di-cache: file bisa muncul tapi tidak hilang selama run
+        self._organized_seen: Set[Tuple[int, str]] = set()
+        # Batch file yang menunggu diorganisir oleh _run_organizer (dibagi dengan worker)
+        self._organize_queue: asyncio.Queue = asyncio.Queue()
+        self._organizer: Optional[asyncio.Task] = None
 
         # Setup logging FIRST (sebelum load database yang pakai log)
-        self.log_stream = open(self.log_file, "a", encoding="utf-8")
+        # Buffer 64 KiB; log() hanya antri, penulisan + flush (per detik/error) oleh _drain_log_queue
+        self.log_stream = open(self.log_file, "a", encoding="utf-8", buffering=1 << 16)
+        self._log_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        # Jumlah log yang dibuang saat queue penuh (dibagi dengan worker)
+        self._log_dropped: Counter = Counter()
+        self._log_drainer: Optional[asyncio.Task] = None
+        # Timestamp log di-cache per detik
+        self._log_second = -1
+        self._log_stamp = ""
+
+        # Cache query yang sudah selesai: {(channel_value, start, end): [filenames]}
+        self.query_cache: Dict[Tuple[int, str, str], List[str]] = self._load_query_cache()
+
+    def _reset_page_state(self):
+        """Reset state download yang terikat ke satu page/browser context"""
+        # Download yang masih berjalan, key id(download) (O(1) add/remove)
+        self.pending_downloads: Dict[int, Download] = {}
+        self.current_download_batch = []  # Track download batch saat ini
+        self.pending_organize: List[str] = []  # File selesai download, belum diorganisir
+
+        # Context tracking - untuk tahu file download dari channel/page mana
+        self.current_channel = None
+        self.current_page = None
+        # Set file DB untuk current_channel/current_page (di-resolve di set_page_context)
+        self._current_page_set: Optional[Set[str]] = None
+        # Query (channel, start, end) dan halaman tabel yang sedang tampil di tab ini
+        self.current_query: Optional[Tuple[int, str, str]] = None
+        self.ui_page: Optional[int] = None
+
+        # Status dialog download terakhir yang di-push oleh observer di page
+        self._dl_status: Optional[Dict] = None
+        self._dl_status_changed = asyncio.Event()
+        # Di-set setiap handler download selesai (batch/pending berubah)
+        self._batch_changed = asyncio.Event()
 
     def log(self, msg: str):
         """Log message to file"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_msg = f"[{timestamp}] {msg}"
-        self.log_stream.write(log_msg + "\n")
-        self.log_stream.flush()
-        print(log_msg)
+        now = int(time.time())
+        if now != self._log_second:
+            self._log_second = now
+            self._log_stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        log_msg = f"[{self._log_stamp}] {self.log_prefix}{msg}"
+        # Progress tick hanya ke file log, tidak di-print ke stdout;
+        # error/warning langsung di-flush ke disk
+        entry = (log_msg, not _QUIET_LOG_RE.match(msg), msg.lstrip().startswith(("[-]", "[!]")))
+        try:
+            self._log_queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # Drainer tertinggal jauh: buang dan hitung. log_stream hanya ditulis oleh
+            # drainer (thread), write langsung dari event loop bisa bertabrakan
+            self._log_dropped["messages"] += 1
+
+    def _dropped_log_entry(self) -> Optional[Tuple[str, bool, bool]]:
+        """Entry log berisi jumlah pesan yang dibuang sejak terakhir dilaporkan"""
+        dropped = self._log_dropped.pop("messages", 0)
+        if not dropped:
+            return None
+        return (f"[{self._log_stamp}] [!] {dropped} log messages dropped (log queue full)", True, True)
+
+    def _write_log_batch(self, batch: List[Tuple[str, bool, bool]], flush: bool = True):
+        """Tulis batch log ke file (satu write) dan stdout"""
+        self.log_stream.write("".join(f"{log_msg}\n" for log_msg, _, _ in batch))
+        if flush:
+            self.log_stream.flush()
+        printed = [log_msg for log_msg, to_stdout, _ in batch if to_stdout]
+        if printed:
+            sys.stdout.write("\n".join(printed) + "\n")
+            sys.stdout.flush()
+
+    async def _drain_log_queue(self, batch_size: int = 64, flush_interval: float = 1.0):
+        """Background task: ambil log dari queue, tulis per batch di thread terpisah
+        File log di-flush maksimal sekali per flush_interval, kecuali ada error
+        Berhenti setelah menerima sentinel None
+        """
+        monotonic = time.monotonic
+        next_flush = monotonic() + flush_interval
+        unflushed = False
+        while True:
+            try:
+                entry = await asyncio.wait_for(
+                    self._log_queue.get(), timeout=flush_interval if unflushed else None
+                )
+            except asyncio.TimeoutError:
+                # Tidak ada log baru, flush sisa buffer
+                await asyncio.to_thread(self.log_stream.flush)
+                next_flush, unflushed = monotonic() + flush_interval, False
+                continue
+
+            batch = []
+            while entry is not None:
+                batch.append(entry)
+                if len(batch) >= batch_size or self._log_queue.empty():
+                    break
+                entry = self._log_queue.get_nowait()
+            dropped = self._dropped_log_entry()
+            if dropped:
+                batch.append(dropped)
+            if batch:
+                flush = entry is None or any(urgent for _, _, urgent in batch)
+                flush = flush or monotonic() >= next_flush
+                await asyncio.to_thread(self._write_log_batch, batch, flush)
+                if flush:
+                    next_flush = monotonic() + flush_interval
+                unflushed = not flush
+            if entry is None:
+                return
+
+    def flush_log_queue(self):
+        """Tulis semua log yang masih antri (dipanggil saat shutdown)"""
+        batch = []
+        while not self._log_queue.empty():
+            batch.append(self._log_queue.get_nowait())
+        dropped = self._dropped_log_entry()
+        if dropped:
+            batch.append(dropped)
+        if batch:
+            self._write_log_batch(batch)
 
     def set_download_date(self, date_str: str):
         """Set tanggal download dan initialize database file
@@ -72,6 +572,8 @@ class DeviceScraper:
 
             self.current_download_date = date_str
             self.downloaded_files_db = self.script_dir / f"files_{formatted_date}.json"
+            # Journal append-only: satu baris per file baru sejak snapshot terakhir
+            self.downloaded_files_journal = self.script_dir / f"files_{formatted_date}.jsonl"
 
             self.log(f"[+] Database file set to: {self.downloaded_files_db.name}")
 
@@ -82,36 +584,77 @@ class DeviceScraper:
             self.log(f"[-] Error setting download date: {str(e)}")
 
     def load_downloaded_files_db(self):
-        """Load database of downloaded files"""
+        """Load database of downloaded files (snapshot JSON + replay journal)"""
         if not self.downloaded_files_db:
             self.log("[*] Database file not set yet")
             return
 
+        self.downloaded_files_db_data = {"channels": {}}
+        self._db_start_times.clear()
+        # Total file dihitung sekali saat load, selanjutnya inkremental di _db_add
+        total_files = 0
         if self.downloaded_files_db.exists():
             try:
-                with open(self.downloaded_files_db, "r") as f:
-                    self.downloaded_files_db_data = json.load(f)
+                self.downloaded_files_db_data = orjson.loads(self.downloaded_files_db.read_bytes())
 
                 # Ensure structure exists
                 if "channels" not in self.downloaded_files_db_data:
                     self.downloaded_files_db_data = {"channels": {}}
 
-                # Count total files
-                total_files = 0
+                # List di file -> set untuk lookup O(1), sekalian hitung total
                 for channel_data in self.downloaded_files_db_data["channels"].values():
-                    for page_files in channel_data.get("pages", {}).values():
-                        total_files += len(page_files)
-
-                self.log(f"[+] Loaded database: {total_files} files across all channels/pages")
+                    pages = channel_data.get("pages", {})
+                    for page_key, page_files in pages.items():
+                        pages[page_key] = set(page_files)
+                        total_files += len(pages[page_key])
             except Exception as e:
                 self.log(f"[-] Error loading database: {str(e)}")
                 self.downloaded_files_db_data = {"channels": {}}
+                total_files = 0
         else:
             self.log(f"[*] No previous database found for this date")
-            self.downloaded_files_db_data = {"channels": {}}
+        self.download_counts["db_total"] = total_files
+
+        # Replay file dari journal yang belum masuk snapshot (misal setelah crash),
+        # termasuk journal lama yang sedang di-compact saat crash
+        replayed = 0
+        for journal_path in (self._rotated_journal_path(), self.downloaded_files_journal):
+            if not journal_path.exists():
+                continue
+            try:
+                with open(journal_path, "rb") as f:
+                    for line in f:
+                        try:
+                            entry = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            continue  # Baris terakhir terpotong
+                        if self._db_add(str(entry["c"]), str(entry["p"]), entry["f"]):
+                            replayed += 1
+            except Exception as e:
+                self.log(f"[-] Error replaying database journal: {str(e)}")
 
-    def save_downloaded_files_db(self, force_log: bool = False):
-        """Save database of downloaded files
+        self.log(
+            f"[+] Loaded database: {self.download_counts['db_total']} files across all channels/pages"
+            + (f" ({replayed} from journal)" if replayed else "")
+        )
+
+        self._db_journal.open(self.downloaded_files_journal)
+        # Entry hasil replay masuk snapshot pada save berikutnya
+        self.download_counts["db_dirty"] = replayed
+
+    def _rotated_journal_path(self) -> Path:
+        """Journal yang sudah dirotasi, dihapus setelah snapshot berikutnya tersimpan"""
+        return self.downloaded_files_journal.with_suffix(".jsonl.old")
+
+    def _write_db_snapshot(self, data: bytes, rotated_journal: Optional[Path]):
+        """Tulis snapshot database (blocking, dijalankan di thread)"""
+        _atomic_write_bytes(self.downloaded_files_db, data)
+        # Isi journal lama sekarang sudah ada di snapshot
+        if rotated_journal:
+            rotated_journal.unlink(missing_ok=True)
+
+    async def save_downloaded_files_db(self, force_log: bool = False):
+        """Save snapshot database (compact) lalu buang journal yang sudah tercakup
         Args:
             force_log: Force logging (default False untuk auto-save realtime)
         """
@@ -120,43 +663,53 @@ class DeviceScraper:
                 self.log("[!] Cannot save - database file not set")
             return
 
-        try:
-            with open(self.downloaded_files_db, "w") as f:
-                json.dump(self.downloaded_files_db_data, f, indent=2)
-
-            # Log hanya jika force atau setiap 10 files
-            if force_log:
-                total_files = 0
-                for channel_data in self.downloaded_files_db_data["channels"].values():
-                    for page_files in channel_data.get("pages", {}).values():
-                        total_files += len(page_files)
-
-                self.log(f"[+] Saved database: {total_files} files")
-        except Exception as e:
-            self.log(f"[-] Error saving database: {str(e)}")
+        # Satu save pada satu waktu (lock dibagi dengan worker)
+        async with self._db_save_lock:
+            # Tidak ada file baru sejak snapshot terakhir: tidak perlu encode/tulis ulang
+            if not self.download_counts["db_dirty"] and self.downloaded_files_db.exists():
+                if force_log:
+                    self.log(f"[*] Database unchanged: {self.download_counts['db_total']} files")
+                return
+            try:
+                # Encode di event loop (dict bisa berubah oleh worker lain), sekali lalu satu write()
+                # Set file per page disimpan sebagai list terurut
+                data = orjson.dumps(self.downloaded_files_db_data, option=DB_DUMP_OPTION, default=sorted)
+
+                # Rotasi journal: entry baru selama snapshot ditulis masuk journal baru
+                # (handle dibagi semua worker, dirotasi di bawah _db_save_lock)
+                rotated_journal = None
+                if self._db_journal.file:
+                    rotated_journal = self._rotated_journal_path()
+                    self._db_journal.rotate(self.downloaded_files_journal, rotated_journal)
+                dirty = self.download_counts["db_dirty"]
+
+                await asyncio.to_thread(self._write_db_snapshot, data, rotated_journal)
+                # Reset hanya setelah snapshot tersimpan; file baru selama write tetap dirty
+                self.download_counts["db_dirty"] -= dirty
+
+                # Log hanya jika force
+                if force_log:
+                    self.log(f"[+] Saved database: {self.download_counts['db_total']} files")
+            except Exception as e:
+                self.log(f"[-] Error saving database: {str(e)}")
 
-    def is_file_downloaded(self, channel: int, page: int, filename: str) -> bool:
-        """Check if file sudah pernah didownload
-        Args:
-            channel: Channel number (0-based index atau channel value)
-            page: Page number
-            filename: Nama file
+    def _db_add(self, channel_key: str, page_key: str, filename: str) -> bool:
+        """Tambah filename ke database in-memory
+        Returns:
+            True jika file belum ada sebelumnya
         """
-        channel_key = str(channel)
-        page_key = str(page)
-
-        if channel_key not in self.downloaded_files_db_data["channels"]:
-            return False
-
-        channel_data = self.downloaded_files_db_data["channels"][channel_key]
-
-        if "pages" not in channel_data:
-            return False
-
-        if page_key not in channel_data["pages"]:
+        channels = self.downloaded_files_db_data["channels"]
+        page_files = channels.setdefault(channel_key, {}).setdefault("pages", {}).setdefault(page_key, set())
+        if filename in page_files:
             return False
-
-        return filename in channel_data["pages"][page_key]
+        page_files.add(filename)
+        self.download_counts["db_total"] += 1
+        start_times = self._db_start_times.get(channel_key)
+        if start_times is not None:
+            match = _FNAME_RE.match(filename)
+            if match:
+                start_times.add("".join(match.groups()[2:8]))
+        return True
 
     def mark_file_downloaded(self, channel: int, page: int, filename: str):
         """Mark file sebagai downloaded
@@ -165,61 +718,179 @@ class DeviceScraper:
             page: Page number
             filename: Nama file
         """
-        channel_key = str(channel)
-        page_key = str(page)
+        # Add filename jika belum ada, lalu append satu baris ke journal (O(1))
+        if self._db_add(str(channel), str(page), filename):
+            self.download_counts["db_dirty"] += 1
+            self._db_journal.write(orjson.dumps({"c": channel, "p": page, "f": filename}) + b"\n")
+
+    def set_page_context(self, channel: int, page: int):
+        """Set channel/page yang sedang di-download dan resolve set file DB-nya sekali
+        Tanpa membuat entry kosong: set baru dibuat _db_add saat file pertama masuk
+        """
+        self.current_channel = channel
+        self.current_page = page
+        self._current_page_set = self._lookup_page_set(channel, page)
+
+    def _lookup_page_set(self, channel: int, page: int) -> Optional[Set[str]]:
+        """Set file DB untuk channel/page, None jika belum ada (read-only)"""
+        return (
+            self.downloaded_files_db_data["channels"]
+            .get(str(channel), {})
+            .get("pages", {})
+            .get(str(page))
+        )
 
-        # Ensure structure exists
-        if channel_key not in self.downloaded_files_db_data["channels"]:
-            self.downloaded_files_db_data["channels"][channel_key] = {"pages": {}}
+    def get_page_stats(self, channel: int, page: int) -> dict:
+        """Get statistik download untuk page tertentu
+        Returns:
+            dict dengan keys: downloaded_count, files (set of filenames)
+        """
+        files = (
+            self.downloaded_files_db_data["channels"]
+            .get(str(channel), {})
+            .get("pages", {})
+            .get(str(page), set())
+        )
+        return {"downloaded_count": len(files), "files": files}
 
-        channel_data = self.downloaded_files_db_data["channels"][channel_key]
+    def get_downloaded_start_times(self, channel: int) -> Set[str]:
+        """Waktu mulai (YYYYMMDDHHmmss) semua file channel ini yang ada di DB
+        Tidak bergantung nomor page, jadi tetap cocok walau pagination bergeser.
+        Channel di-scan sekali, setelah itu index diupdate inkremental oleh _db_add
+        (set yang dikembalikan hanya untuk dibaca)
+        """
+        channel_key = str(channel)
+        start_times = self._db_start_times.get(channel_key)
+        if start_times is not None:
+            return start_times
+
+        channel_data = self.downloaded_files_db_data["channels"].get(channel_key, {})
+        start_times = set()
+        for page_files in channel_data.get("pages", {}).values():
+            for filename in page_files:
+                match = _FNAME_RE.match(filename)
+                if match:
+                    start_times.add("".join(match.groups()[2:8]))
+        self._db_start_times[channel_key] = start_times
+        return start_times
+
+    def rows_downloaded(
+        self, channel: int, table_data: List[Dict], start_times: Optional[Set[str]] = None
+    ) -> bool:
+        """Check apakah semua baris tabel sudah punya file di DB (match startTime)"""
+        if start_times is None:
+            start_times = self.get_downloaded_start_times(channel)
+        return all(
+            _NON_DIGIT_RE.sub("", row["startTime"]) in start_times for row in table_data
+        )
 
-        if "pages" not in channel_data:
-            channel_data["pages"] = {}
+    def _load_query_cache(self) -> Dict[Tuple[int, str, str], List[str]]:
+        """Load cache query channel yang sudah selesai dari run sebelumnya"""
+        if not self.query_cache_path.exists():
+            return {}
+        try:
+            with open(self.query_cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            self.log(f"[-] Error loading query cache: {str(e)}")
+            return {}
 
-        if page_key not in channel_data["pages"]:
-            channel_data["pages"][page_key] = []
+    async def save_query_cache(self):
+        """Save cache query secara atomic (tulis .tmp lalu os.replace)
+        Data di-serialize di loop, tulis + fsync di thread supaya loop tidak blocking
+        """
+        try:
+            await asyncio.to_thread(
+                _atomic_write_bytes, self.query_cache_path, pickle.dumps(self.query_cache)
+            )
+        except Exception as e:
+            self.log(f"[-] Error saving query cache: {str(e)}")
+
+    async def record_query_cache(self, channel: int, start_date: str, end_date: str):
+        """Simpan semua file channel ini (dari DB) sebagai hasil query yang lengkap"""
+        channel_data = self.downloaded_files_db_data["channels"].get(str(channel), {})
+        filenames = [
+            filename
+            for page_files in channel_data.get("pages", {}).values()
+            for filename in page_files
+        ]
+        # Buang entry range tanggal lain (run sebelumnya), supaya cache tidak tumbuh terus
+        # Dict dipakai bersama oleh semua worker, jadi dihapus in-place
+        for key in [key for key in self.query_cache if key[1:] != (start_date, end_date)]:
+            del self.query_cache[key]
+        self.query_cache[(channel, start_date, end_date)] = filenames
+        await self.save_query_cache()
+
+    def is_query_cached(self, channel: int, start_date: str, end_date: str) -> bool:
+        """Check apakah query channel ini sudah lengkap dan semua file masih ada di disk
+        Cache kosong atau berisi nama yang tidak bisa di-parse dianggap tidak lengkap
+        """
+        filenames = self.query_cache.get((channel, start_date, end_date))
+        if not filenames:
+            return False
 
-        # Add filename jika belum ada
-        if filename not in channel_data["pages"][page_key]:
-            channel_data["pages"][page_key].append(filename)
+        for filename in filenames:
+            parsed = _parse_download_name(filename)
+            if not parsed or not self._organized_exists(*parsed):
+                return False
+        return True
 
-            # Auto-save realtime setiap file (tanpa log spam)
-            self.save_downloaded_files_db(force_log=False)
+    def load_channels_cache(self) -> Optional[List[Dict]]:
+        """Load daftar active channel dari cache jika umurnya < CHANNELS_CACHE_TTL"""
+        try:
+            age = time.time() - self.channels_cache_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if age >= CHANNELS_CACHE_TTL:
+            return None
 
-    def get_page_stats(self, channel: int, page: int) -> dict:
-        """Get statistik download untuk page tertentu
-        Returns:
-            dict dengan keys: downloaded_count, files (list of filenames)
-        """
-        channel_key = str(channel)
-        page_key = str(page)
+        try:
+            channels = json.loads(self.channels_cache_path.read_text())
+        except Exception as e:
+            self.log(f"[-] Error loading channels cache: {str(e)}")
+            return None
 
-        if channel_key not in self.downloaded_files_db_data["channels"]:
-            return {"downloaded_count": 0, "files": []}
+        self.log(f"[+] Active channels from cache: {len(channels)}")
+        return channels
 
-        channel_data = self.downloaded_files_db_data["channels"][channel_key]
+    async def save_channels_cache(self, channels: List[Dict]):
+        """Save daftar active channel (sudah difilter) ke cache"""
+        try:
+            await asyncio.to_thread(
+                _atomic_write_bytes, self.channels_cache_path, json.dumps(channels).encode()
+            )
+        except Exception as e:
+            self.log(f"[-] Error saving channels cache: {str(e)}")
 
-        if "pages" not in channel_data or page_key not in channel_data["pages"]:
-            return {"downloaded_count": 0, "files": []}
+    def _fresh_session_state(self) -> Optional[str]:
+        """Path storage state jika umurnya < SESSION_STATE_TTL, selain itu None"""
+        try:
+            age = time.time() - self.session_state_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        return str(self.session_state_path) if age < SESSION_STATE_TTL else None
 
-        files = channel_data["pages"][page_key]
-        return {"downloaded_count": len(files), "files": files}
-        if len(self.downloaded_files_set) % 10 == 0:
-            self.save_downloaded_files_db(force_log=True)
+    async def save_session_state(self):
+        """Save storage state context (cookies + localStorage) untuk run berikutnya"""
+        try:
+            await self.page.context.storage_state(path=str(self.session_state_path))
+            self.log("[+] Session state saved")
+        except Exception as e:
+            self.log(f"[-] Error saving session state: {str(e)}")
 
     async def save_cookies(self):
         """Save browser cookies to file"""
         cookies = await self.page.context.cookies()
-        with open(self.cookie_path, "w") as f:
-            json.dump(cookies, f, indent=2)
+        # File I/O di thread supaya event loop tidak blocking
+        await asyncio.to_thread(
+            _atomic_write_bytes, self.cookie_path, orjson.dumps(cookies, option=orjson.OPT_INDENT_2)
+        )
         self.log("[+] Cookies saved")
 
     async def load_cookies(self) -> bool:
         """Load cookies from file"""
         if self.cookie_path.exists():
-            with open(self.cookie_path, "r") as f:
-                cookies = json.load(f)
+            cookies = orjson.loads(await asyncio.to_thread(self.cookie_path.read_bytes))
             await self.page.context.add_cookies(cookies)
             self.log("[+] Cookies loaded")
             return True
@@ -228,15 +899,13 @@ class DeviceScraper:
     async def save_local_storage(self):
         """Save localStorage to file"""
         storage = await self.page.evaluate("() => JSON.stringify(localStorage)")
-        with open(self.storage_path, "w") as f:
-            f.write(storage)
+        await asyncio.to_thread(_atomic_write_bytes, self.storage_path, storage.encode())
         self.log("[+] LocalStorage saved")
 
     async def load_local_storage(self) -> bool:
         """Load localStorage from file"""
         if self.storage_path.exists():
-            with open(self.storage_path, "r") as f:
-                storage = f.read()
+            storage = await asyncio.to_thread(self.storage_path.read_text)
 
             await self.page.evaluate(
                 f"""(storage) => {{
@@ -274,6 +943,9 @@ class DeviceScraper:
 
     async def re_login_and_resume(self, channel_value: int, page_num: int, start_date: str, end_date: str) -> bool:
         """Re-login and resume to specific channel and page"""
+        # Tabel tab ini tidak valid sampai resume berhasil (juga jika gagal di tengah jalan)
+        self.current_query = None
+        self.ui_page = None
         try:
             self.log(f"[*] Re-login and resume to channel {channel_value}, page {page_num}")
 
@@ -281,59 +953,44 @@ class DeviceScraper:
             await asyncio.sleep(3)
 
             # Login with retry mechanism
-            if not await self.login("scrapper", "sc@10001"):
-                self.log("[-] Re-login failed after all retries")
-                return False
+            # Satu login pada satu waktu: page lain di context yang sama cukup
+            # restore session dari cookies hasil login worker sebelumnya
+            async with self._login_lock:
+                if not await self.login("scrapper", "sc@10001"):
+                    self.log("[-] Re-login failed after all retries")
+                    return False
 
             self.log("[+] Re-login successful")
-            await asyncio.sleep(2)  # Increased wait after login
 
             # Navigate to playback menu
             self.log("[*] Navigating to playback menu...")
-            await self.click_xpath('//*[@id="main_playback"]')
-            await asyncio.sleep(2)  # Increased delay
-            await self.click_xpath('//*[@id="playback_new_download"]')
+            await self.open_playback_menu()
             self.log("[+] Entered playback menu")
-            await asyncio.sleep(2)  # Increased delay
 
             # Select channel
             if not await self.select_channel(channel_value):
                 self.log(f"[-] Failed to re-select channel {channel_value}")
                 return False
 
-            await asyncio.sleep(1)
-
             # Set date range
             if not await self.set_date_range(start_date, end_date):
                 self.log("[-] Failed to re-set date range")
                 return False
 
-            await asyncio.sleep(1)
-
-            # Query playback
+            # Query playback (menunggu tabel + jumlah halaman)
             if not await self.query_playback():
                 self.log("[-] Failed to re-query playback")
                 return False
 
-            await asyncio.sleep(1)
-
             # Navigate to page if not page 1
             if page_num > 1:
                 self.log(f"[*] Navigating back to page {page_num}...")
-                await self.page.evaluate(
-                    f"""(targetPage) => {{
-                    const input = document.getElementById('playback_jump_page');
-                    const btn = document.getElementById('playback_jump');
-                    if (input && btn) {{
-                        input.value = targetPage;
-                        btn.click();
-                    }}
-                }}""",
-                    page_num,
-                )
-                await asyncio.sleep(3)  # Increased delay for page navigation
+                if not await self.jump_to_page(page_num):
+                    return False
 
             self.log(f"[+] Successfully resumed to channel {channel_value}, page {page_num}")
+            self.current_query = (channel_value, start_date, end_date)
+            self.ui_page = page_num
             return True
 
         except Exception as e:
@@ -342,6 +999,9 @@ class DeviceScraper:
 
     async def initialize(self):
         """Initialize browser and page"""
+        self._log_drainer = asyncio.create_task(self._drain_log_queue())
+        self._organizer = asyncio.create_task(self._run_organizer())
+        await self._organize_leftover_downloads()
         self.log("[*] Launching browser...")
 
         self.playwright = await async_playwright().start()
@@ -351,40 +1011,154 @@ class DeviceScraper:
                 "--no-sandbox",
                 "--disable-setuid-sandbox",
                 "--disable-dev-shm-usage",
+                "--blink-settings=imagesEnabled=false",
             ],
         )
 
         # Create context with download path
+        # Pakai ulang storage state run sebelumnya jika masih baru
+        session_state = self._fresh_session_state()
         context = await self.browser.new_context(
             accept_downloads=True,
+            storage_state=session_state,
         )
+        self._session_preloaded = session_state is not None
+        # Block gambar/font untuk semua page (termasuk worker)
+        await context.route(_BLOCKED_RESOURCE_RE, lambda route: route.abort())
+        if self._session_preloaded:
+            self.log("[+] Context created from saved session state")
+
+        self.page = await self._setup_page(context)
+
+        self.log(f"[+] Browser ready, downloads to: {self.download_dir}")
 
-        self.page = await context.new_page()
+    async def _setup_page(self, context) -> Page:
+        """Create page di context dan pasang observer + download handler"""
+        page = await context.new_page()
+
+        # Observer status download (dipasang ulang otomatis setiap navigasi)
+        await page.expose_function("__pdStatus", self._on_dl_status)
+        await page.add_init_script(_DL_OBSERVER_JS)
 
         # Setup download handler
-        self.page.on("download", self._handle_download)
+        page.on("download", self._handle_download)
+        return page
 
-        self.log(f"[+] Browser ready, downloads to: {self.download_dir}")
+    def _on_dl_status(self, status: Dict):
+        """Callback dari observer di page setiap status dialog download berubah"""
+        self._dl_status = status
+        self._dl_status_changed.set()
+
+    async def open_playback_menu(self):
+        """Masuk ke menu playback download
+        Menunggu elemen yang dimunculkan setiap klik, bukan delay tetap
+        """
+        await self.click_id("main_playback")
+        try:
+            await self.page.wait_for_selector("#playback_new_download", state="visible", timeout=5000)
+        except Exception:
+            self.log("[!] Playback submenu not visible after 5s")
+        await self.click_id("playback_new_download")
+        self.log("[*] Entering playback menu...")
+        try:
+            await self.page.wait_for_selector("#playback_down_channel", state="attached", timeout=5000)
+        except Exception:
+            self.log("[!] Playback download form not ready after 5s")
+        await asyncio.sleep(0.1)
+
+    async def spawn_worker(self, worker_id: int) -> Optional["DeviceScraper"]:
+        """Buat worker dengan page baru di browser context yang sama
+        Worker berbagi browser context (cookies/localStorage), database, dan log
+        dengan scraper ini, tapi punya page dan download tracking sendiri.
+        Args:
+            worker_id: Nomor worker (untuk prefix log)
+        """
+        try:
+            worker = copy.copy(self)
+            worker._reset_page_state()
+            worker.log_prefix = f"[W{worker_id}] "
+            worker.page = await worker._setup_page(self.page.context)
+
+            await worker.page.goto(f"{self.base_url}/", timeout=45000)
+            if not await worker.check_session():
+                if not await worker.login("scrapper", "sc@10001"):
+                    worker.log("[-] Worker login failed")
+                    await worker.page.close()
+                    return None
+
+            await worker.open_playback_menu()
+            worker.log("[+] Worker ready")
+            return worker
+        except Exception as error:
+            self.log(f"[-] Error spawning worker {worker_id}: {str(error)}")
+            return None
+
+    async def _cancel_pending_downloads(self):
+        """Cancel download yang masih berjalan sebelum context/browser ditutup"""
+        downloads = list(self.pending_downloads.values())
+        self.pending_downloads.clear()
+        for download in downloads:
+            try:
+                await download.cancel()
+            except Exception:
+                pass
+        if downloads:
+            self.log(f"[!] Cancelled {len(downloads)} unfinished downloads")
+
+    async def _abort_download_batch(self) -> bool:
+        """Hentikan batch yang timeout sebelum tab dipakai halaman lain:
+        klik Stop di dialog DVR, cancel download yang masih jalan, lalu tunggu dialog idle
+        Returns:
+            True jika dialog sudah idle
+        """
+        try:
+            await self.page.locator("#playback_down_stop:not([disabled])").click(timeout=5000)
+            self.log("[*] Download dialog stopped")
+        except Exception:
+            pass  # Dialog sudah tertutup / tombol Stop sudah disabled
+        await self._cancel_pending_downloads()
+        try:
+            await self.page.wait_for_function(_DL_IDLE_JS, timeout=30000)
+            return True
+        except Exception as error:
+            self.log(f"[-] Download dialog still busy after stop: {str(error)}")
+            # Tabel tab ini tidak bisa dipercaya lagi, paksa query ulang
+            self.current_query = None
+            self.ui_page = None
+            return False
+
+    async def close_worker(self):
+        """Close page milik worker (context dipakai bersama)"""
+        await self._cancel_pending_downloads()
+        await self._flush_organize()
+        await self.page.close()
+        self.log("[+] Worker closed")
 
     async def _handle_download(self, download):
         """Handle file download"""
+        # Konteks diambil saat event masuk: download yang selesai terlambat
+        # tetap dicatat ke halaman/batch asalnya, bukan halaman berikutnya
+        channel, page_num, batch = self.current_channel, self.current_page, self.current_download_batch
         try:
             # Add to pending downloads
-            self.pending_downloads.append(download)
+            download_id = id(download)
+            self.pending_downloads[download_id] = download
 
             # Get suggested filename
             filename = download.suggested_filename
             save_path = self.download_dir / filename
 
             # Check if file already downloaded before (di DB) untuk channel/page ini
-            if self.current_channel is not None and self.current_page is not None:
-                if self.is_file_downloaded(self.current_channel, self.current_page, filename):
-                    self.log(f"[SKIP] Already in DB - Ch{self.current_channel} P{self.current_page}: {filename}")
-                    if download in self.pending_downloads:
-                        self.pending_downloads.remove(download)
+            # Set page dibuat lazily oleh _db_add, resolve ulang selama belum ada
+            if self._current_page_set is None and channel is not None:
+                self._current_page_set = self._lookup_page_set(channel, page_num)
+            if self._current_page_set is not None:
+                if filename in self._current_page_set:
+                    self.log(f"[SKIP] Already in DB - Ch{channel} P{page_num}: {filename}")
+                    self.pending_downloads.pop(download_id, None)
                     # Mark as completed dan add to batch untuk tracking
-                    self.completed_downloads.append(filename)
-                    self.current_download_batch.append(filename)
+                    self.download_counts["completed"] += 1
+                    batch.append(filename)
                     await download.cancel()
                     return
 
@@ -392,52 +1166,53 @@ class DeviceScraper:
             if self.check_file_exists(filename):
                 self.log(f"[SKIP] File exists in organized dir: {filename}")
                 # Mark as downloaded in DB
-                if self.current_channel is not None and self.current_page is not None:
-                    self.mark_file_downloaded(self.current_channel, self.current_page, filename)
-                if download in self.pending_downloads:
-                    self.pending_downloads.remove(download)
-                self.completed_downloads.append(filename)
+                if channel is not None and page_num is not None:
+                    self.mark_file_downloaded(channel, page_num, filename)
+                self.pending_downloads.pop(download_id, None)
+                self.download_counts["completed"] += 1
+                batch.append(filename)
                 await download.cancel()
                 return
 
             self.log(f"[*] Downloading: {filename}")
             self.log(f"[*] Save path: {save_path}")
 
-            # Save the download
-            await download.save_as(str(save_path))
-
-            # Verify file exists and has size
-            if save_path.exists():
-                file_size = save_path.stat().st_size
-                if file_size > 0:
-                    self.log(f"[+] File saved: {filename} ({file_size} bytes)")
-
-                    # Mark as downloaded in DB with channel/page context
-                    if self.current_channel is not None and self.current_page is not None:
-                        self.mark_file_downloaded(self.current_channel, self.current_page, filename)
-                        # Note: save sudah dipanggil di dalam mark_file_downloaded()
-
-                    # Move to completed
-                    if download in self.pending_downloads:
-                        self.pending_downloads.remove(download)
-                    self.completed_downloads.append(filename)
-                    self.current_download_batch.append(filename)
-
-                    self.log(
-                        f"[+] Download completed: {filename} (Total session: {len(self.completed_downloads)})"
-                    )
-
-                    # Organize file immediately (real-time)
-                    await self._organize_single_file(filename)
-                else:
-                    self.log(f"[-] WARNING: File has 0 bytes: {save_path}")
-                    save_path.unlink()  # Delete empty file
-                    if download in self.pending_downloads:
-                        self.pending_downloads.remove(download)
+            # Pindahkan file temp Playwright ke download_dir (rename, tanpa copy)
+            # rename + stat dalam satu thread hop; error = file tidak ada/gagal pindah
+            temp_path = await download.path()
+            try:
+                file_size = await asyncio.to_thread(_replace_and_size, temp_path, save_path)
+            except OSError as error:
+                if error.errno != errno.EXDEV:
+                    raise
+                # Beda filesystem - fallback ke copy oleh Playwright
+                await download.save_as(str(save_path))
+                # Hapus file temp Playwright, salinannya sudah di download_dir
+                await download.delete()
+                file_size = (await asyncio.to_thread(os.stat, save_path)).st_size
+
+            if file_size > 0:
+                self.log(f"[+] File saved: {filename} ({file_size} bytes)")
+
+                # Mark as downloaded in DB with channel/page context
+                if channel is not None and page_num is not None:
+                    self.mark_file_downloaded(channel, page_num, filename)
+
+                # Move to completed
+                self.pending_downloads.pop(download_id, None)
+                self.download_counts["completed"] += 1
+                batch.append(filename)
+
+                self.log(
+                    f"[+] Download completed: {filename} (Total session: {self.download_counts['completed']})"
+                )
+
+                # Organisasi dilakukan sekaligus setelah batch selesai
+                self.pending_organize.append(filename)
             else:
-                self.log(f"[-] WARNING: File not found after save: {save_path}")
-                if download in self.pending_downloads:
-                    self.pending_downloads.remove(download)
+                self.log(f"[-] WARNING: File has 0 bytes: {save_path}")
+                save_path.unlink()  # Delete empty file
+                self.pending_downloads.pop(download_id, None)
 
         except Exception as e:
             self.log(
@@ -446,62 +1221,94 @@ class DeviceScraper:
             import traceback
 
             self.log(f"[-] Traceback: {traceback.format_exc()}")
-            if download in self.pending_downloads:
-                self.pending_downloads.remove(download)
+            self.pending_downloads.pop(download_id, None)
+        finally:
+            # Bangunkan yang menunggu batch (wait_for_download_completion/_wait_for_batch_files)
+            self._batch_changed.set()
+            self._dl_status_changed.set()
+
+    async def _flush_organize(self):
+        """Serahkan semua file batch ini ke organizer, tanpa menunggu selesai
+        Worker bisa langsung lanjut ke halaman berikutnya
+        """
+        if not self.pending_organize:
+            return
+
+        files, self.pending_organize = self.pending_organize, []
+        if self._organizer and not self._organizer.done():
+            self._organize_queue.put_nowait(files)
+        else:
+            await self._organize_batch(files)
+
+    async def _organize_batch(self, files: List[str]):
+        """Organize satu batch file hasil download"""
+        for filename in files:
+            await self._organize_single_file(filename)
+
+        self.log(f"[+] Organized batch: {len(files)} files")
+
+    async def _organize_leftover_downloads(self):
+        """Organize file .mp4 yang tertinggal di download_dir dari run sebelumnya
+        (sudah tercatat di journal DB, tapi proses berhenti sebelum batch di-organize)
+        """
+
+        def scan() -> List[str]:
+            with os.scandir(self.download_dir) as entries:
+                return [
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith(".mp4") and entry.is_file()
+                ]
+
+        try:
+            files = await asyncio.to_thread(scan)
+        except OSError as e:
+            self.log(f"[-] Error scanning download dir: {str(e)}")
+            return
+        if files:
+            self.log(f"[*] Found {len(files)} leftover downloads, organizing...")
+            self._organize_queue.put_nowait(files)
+
+    async def _run_organizer(self):
+        """Background consumer: organize batch dari queue sampai menerima sentinel None"""
+        while True:
+            files = await self._organize_queue.get()
+            if files is None:
+                return
+            await self._organize_batch(files)
 
     async def _organize_single_file(self, filename: str):
-        """Organize a single downloaded file immediately"""
+        """Organize a single downloaded file"""
         try:
             if not filename.endswith(".mp4"):
                 return
 
-            # Parse filename: 192.168.88.19_1_20250129004231_20250129004252.mp4
-            # Format: IP_CHANNEL_STARTTIME_ENDTIME.mp4
-            # Time format: YYYYMMDDHHmmss
-            full_match = re.search(
-                r"\d+\.\d+\.\d+\.\d+_(\d{3})_(\d{14})([A-F0-9]{4})\.mp4$",
-                filename,
-            )
-
-            if not full_match:
+            parsed = _parse_download_name(filename)
+            if not parsed:
                 self.log(f"[-] Could not parse filename: {filename}")
                 return
+            channel_num, new_filename = parsed
 
-            # Extract components
-            channel_num = int(full_match.group(1))
-            timestamp = full_match.group(2)
-            # random_hex = full_match.group(3)  # not used
-
-            # Parse timestamp
-            start_year = timestamp[0:4]
-            start_month = timestamp[4:6]
-            start_day = timestamp[6:8]
-            start_hour = timestamp[8:10]
-            start_minute = timestamp[10:12]
-            start_second = timestamp[12:14]
-
-            # Format components
-            date_str = f"{start_year}-{start_month}-{start_day}"
-            start_formatted = f"{start_hour}-{start_minute}-{start_second}"
-
-            # Create channel folder
-            channel_folder = self.organized_dir / f"channel{channel_num}"
-            channel_folder.mkdir(exist_ok=True)
-
-            # Generate new filename
-            new_filename = f"{date_str}.{start_formatted}.mp4"
+            # Create channel folder (sekali per channel per session)
+            channel_folder = self._channel_dir(channel_num)
+            if channel_num not in self._ensured_channels:
+                await asyncio.to_thread(channel_folder.mkdir, exist_ok=True)
+                self._ensured_channels.add(channel_num)
 
             old_path = self.download_dir / filename
             new_path = channel_folder / new_filename
 
-            # Move file
-            if old_path.exists():
-                os.rename(old_path, new_path)
-                self.log(
-                    f"[✓] Organized: {filename} → channel{channel_num}/{new_filename}"
-                )
-            else:
+            # Move file (tanpa cek exists terlebih dulu)
+            try:
+                await asyncio.to_thread(os.rename, old_path, new_path)
+            except FileNotFoundError:
                 self.log(f"[-] File not found for organization: {filename}")
+                return
+
+            self._organized_seen.add(parsed)
+            self.log(
+                f"[✓] Organized: {filename} → channel{channel_num}/{new_filename}"
+            )
 
         except Exception as e:
             self.log(f"[-] Error organizing {filename}: {str(e)}")
@@ -509,10 +1316,37 @@ class DeviceScraper:
 
             self.log(f"[-] Traceback: {traceback.format_exc()}")
 
+    async def _restore_session(self) -> bool:
+        """Coba login pakai cookies/localStorage tersimpan tanpa isi form"""
+        try:
+            # Context dari storage state sudah membawa cookies + localStorage
+            if not self._session_preloaded and not await self.load_cookies():
+                return False
+
+            await self.page.goto(
+                f"{self.base_url}/", wait_until="domcontentloaded", timeout=10000
+            )
+            if not self._session_preloaded:
+                await self.load_local_storage()
+            await self.page.wait_for_selector("#main_user_logo", timeout=3000)
+            self.log("[+] Session restored from saved cookies")
+            await self.save_session_state()
+            return True
+        except PlaywrightTimeout:
+            self.log("[*] Saved session no longer valid - full login")
+            return False
+        except Exception as error:
+            self.log(f"[-] Error restoring session: {str(error)}")
+            return False
+
     async def login(
         self, username: str = "scrapper", password: str = "sc@10001"
     ) -> bool:
         """Login to device with retry mechanism"""
+        # Fast-path: session tersimpan masih valid, tidak perlu isi form
+        if await self._restore_session():
+            return True
+
         max_retries = 3
         base_delay = 5  # Base delay in seconds
 
@@ -534,24 +1368,19 @@ class DeviceScraper:
                 await self.page.wait_for_function(
                     "() => window.location.hash.includes('login')", timeout=30000
                 )
-                await asyncio.sleep(1)
 
                 self.log("[*] Waiting for login form...")
-                await self.page.wait_for_selector("#login_u", timeout=30000)
+                await self.page.wait_for_selector("#login_u", state="visible", timeout=30000)
+                # Form siap jika tombol login sudah tampil
+                await self.page.wait_for_selector("#login_s", state="visible", timeout=30000)
                 self.log("[+] Login form found")
 
-                self.log("[*] Pause 2 detik - tunggu form siap...")
-                await asyncio.sleep(2)
-
                 self.log(f"[*] Entering username: {username}")
-                await self.page.type("#login_u", username, delay=100)
-                await asyncio.sleep(0.2)
+                await self.page.type("#login_u", username)
 
                 self.log(f"[*] Entering password: {'*' * len(password)}")
                 await self.page.click("#login_p")
-                await asyncio.sleep(0.5)
-                await self.page.type("#login_p", password, delay=100)
-                await asyncio.sleep(1)
+                await self.page.type("#login_p", password)
 
                 self.log("[*] Clicking login button...")
                 await self.page.click("#login_s")
@@ -561,7 +1390,6 @@ class DeviceScraper:
                 await self.page.wait_for_function(
                     "() => !window.location.hash.includes('login')", timeout=30000
                 )
-                await asyncio.sleep(1)
 
                 current_url = self.page.url
                 self.log(f"[*] Current URL: {current_url}")
@@ -570,7 +1398,10 @@ class DeviceScraper:
                 try:
                     await self.page.wait_for_selector("#main_user_logo", timeout=15000)
                     self.log("[+] Login berhasil!")
-                    await asyncio.sleep(1.5)
+                    # Simpan session untuk fast-path login berikutnya
+                    await self.save_cookies()
+                    await self.save_local_storage()
+                    await self.save_session_state()
                     return True
                 except PlaywrightTimeout:
                     self.log("[-] Login gagal - element login tidak ditemukan")
@@ -592,43 +1423,26 @@ class DeviceScraper:
         self.log(f"[-] Login failed after {max_retries} attempts")
         return False
 
-    async def click_xpath(self, xpath: str) -> bool:
-        """Click element by XPath"""
+    async def click_id(self, element_id: str) -> bool:
+        """Click element by id via Playwright locator"""
         try:
-            await self.page.evaluate(
-                f"""(xpath) => {{
-                const element = document.evaluate(
-                    xpath,
-                    document,
-                    null,
-                    XPathResult.FIRST_ORDERED_NODE_TYPE,
-                    null
-                ).singleNodeValue;
-                if (element) {{
-                    element.click();
-                }}
-            }}""",
-                xpath,
-            )
-            self.log(f"[+] Clicked element: {xpath}")
+            await self.page.locator(f"#{element_id}").click(timeout=5000)
+            self.log(f"[+] Clicked element: #{element_id}")
             return True
         except Exception as error:
-            self.log(f"[-] Error clicking XPath: {str(error)}")
+            self.log(f"[-] Error clicking #{element_id}: {str(error)}")
             return False
 
     async def get_channel_list(self) -> List[Dict]:
         """Get list of available channels"""
         try:
             self.log("[*] Extracting channel list...")
-            channels = await self.page.evaluate("""() => {
+            options = await self.page.evaluate("""() => {
                 const select = document.getElementById('playback_down_channel');
                 if (!select) return [];
-                const options = Array.from(select.options);
-                return options.map(opt => ({
-                    value: parseInt(opt.value),
-                    label: opt.textContent.trim()
-                }));
+                return Array.from(select.options, opt => [parseInt(opt.value), opt.textContent.trim()]);
             }""")
+            channels = [{"value": value, "label": label} for value, label in options]
             self.log(f"[+] Found {len(channels)} channels")
             return channels
         except Exception as error:
@@ -639,8 +1453,12 @@ class DeviceScraper:
         """Select a channel"""
         try:
             await self.page.select_option("#playback_down_channel", str(channel_value))
+            await self.page.wait_for_function(
+                "(value) => document.getElementById('playback_down_channel').value === value",
+                arg=str(channel_value),
+                timeout=5000,
+            )
             self.log(f"[+] Selected channel value: {channel_value}")
-            await asyncio.sleep(0.5)
             return True
         except Exception as error:
             self.log(f"[-] Error selecting channel: {str(error)}")
@@ -651,23 +1469,27 @@ class DeviceScraper:
         try:
             self.log(f"[*] Setting date range: {start_date} to {end_date}")
 
-            # Set start date
-            await self.page.evaluate("""() => {
-                const elem = document.getElementById('playback_down_start');
-                elem.value = '';
-                elem.focus();
-            }""")
-            await self.page.type("#playback_down_start", start_date, delay=50)
-            await asyncio.sleep(0.3)
-
-            # Set end date
-            await self.page.evaluate("""() => {
-                const elem = document.getElementById('playback_down_end');
-                elem.value = '';
-                elem.focus();
-            }""")
-            await self.page.type("#playback_down_end", end_date, delay=50)
-            await asyncio.sleep(0.3)
+            # Set kedua tanggal dalam satu evaluate (tanpa ketik per karakter),
+            # return input yang nilainya tidak bertahan setelah event
+            rejected = await self.page.evaluate(
+                """([start, end]) => {
+                const rejected = [];
+                for (const [id, value] of [['playback_down_start', start], ['playback_down_end', end]]) {
+                    const elem = document.getElementById(id);
+                    elem.value = value;
+                    elem.dispatchEvent(new Event('input', {bubbles: true}));
+                    elem.dispatchEvent(new Event('change', {bubbles: true}));
+                    if (elem.value !== value) rejected.push([id, value]);
+                }
+                return rejected;
+            }""",
+                [start_date, end_date],
+            )
+
+            # Fallback: widget menolak assignment langsung, isi lewat input keyboard
+            for element_id, value in rejected:
+                self.log(f"[*] {element_id} ignored programmatic value, typing instead")
+                await self.page.fill(f"#{element_id}", value)
 
             self.log("[+] Date range set")
             return True
@@ -679,21 +1501,22 @@ class DeviceScraper:
         """Query playback recordings"""
         try:
             self.log("[*] Querying playback...")
-            await self.click_xpath('//*[@id="playback_down_query"]')
-
-            # Wait for table to load
-            await asyncio.sleep(2)
-
-            # Check if table exists
-            table_exists = await self.page.evaluate("""() => {
-                const table = document.querySelector('div.td-table-body');
-                return table ? true : false;
-            }""")
-
-            if not table_exists:
-                self.log("[-] No results table found")
+            # Tab worker dipakai ulang: tabel/pagecount query sebelumnya masih ada di DOM
+            before = await self.page.evaluate(_TABLE_SNAPSHOT_JS)
+            if not await self.click_id("playback_down_query"):
                 return False
 
+            # Tunggu tabel berisi hasil query ini, bukan hasil query sebelumnya
+            try:
+                await self.page.wait_for_function(_TABLE_CHANGED_JS, arg=before, timeout=10000)
+            except PlaywrightTimeout:
+                if before["rows"]:
+                    # Baris lama masih tampil: hasil bisa basi, jangan dibaca
+                    self.log("[-] Results table not refreshed after query")
+                    return False
+                # Sebelumnya kosong dan tetap kosong: query tanpa hasil
+                self.log("[*] Results table still empty, assuming no files")
+
             self.log("[+] Query completed")
             return True
         except Exception as error:
@@ -705,21 +1528,9 @@ class DeviceScraper:
         try:
             self.log("[*] Extracting table data...")
 
-            table_data = await self.page.evaluate("""() => {
-                const rows = Array.from(
-                    document.querySelectorAll('div.td-table-body div.td-table-row')
-                );
-                return rows.map(row => {
-                    const cells = Array.from(row.querySelectorAll('span.td-table-cell'));
-                    return {
-                        channel: cells[1]?.textContent?.trim() || '',
-                        startTime: cells[2]?.textContent?.trim() || '',
-                        endTime: cells[3]?.textContent?.trim() || '',
-                        type: cells[4]?.textContent?.trim() || '',
-                        lock: cells[5]?.textContent?.trim() || ''
-                    };
-                });
-            }""")
+            # Baris dikirim sebagai array (tanpa nama key) supaya payload CDP kecil
+            rows = await self.page.evaluate(_READ_ROWS_JS)
+            table_data = [dict(zip(_TABLE_FIELDS, row)) for row in rows]
 
             self.log(f"[+] Extracted {len(table_data)} files from table")
             return table_data
@@ -727,6 +1538,45 @@ class DeviceScraper:
             self.log(f"[-] Error extracting table data: {str(error)}")
             return []
 
+    async def extract_all_pages(self, total_pages: int) -> List[List[Dict]]:
+        """Extract tabel semua halaman dalam satu evaluate (pagination di browser)
+        Returns:
+            List baris per halaman; bisa lebih pendek dari total_pages jika navigasi gagal
+        """
+        try:
+            self.log(f"[*] Extracting table data for {total_pages} pages...")
+            pages = await self.page.evaluate(_ALL_PAGES_JS, total_pages)
+            pages_data = [[dict(zip(_TABLE_FIELDS, row)) for row in rows] for rows in pages]
+            self.log(
+                f"[+] Extracted {sum(map(len, pages_data))} files from {len(pages_data)} pages"
+            )
+            return pages_data
+        except Exception as error:
+            self.log(f"[-] Error extracting all pages: {str(error)}")
+            return []
+
+    async def jump_to_page(self, page_num: int) -> bool:
+        """Navigasi tabel hasil query ke halaman tertentu
+        Returns:
+            True setelah indikator halaman menunjukkan page_num
+        """
+        try:
+            await self.page.fill("#playback_jump_page", str(page_num), timeout=5000)
+            await self.page.locator("#playback_jump").click(timeout=5000)
+        except PlaywrightTimeout:
+            self.log(f"[-] Page jump controls not available for page {page_num}")
+            return False
+        try:
+            await self.page.wait_for_function(
+                "(p) => parseInt(document.getElementById('playback_pagecur')?.textContent) === p",
+                arg=page_num,
+                timeout=10000,
+            )
+            return True
+        except PlaywrightTimeout:
+            self.log(f"[-] Page {page_num} not shown after 10s")
+            return False
+
     async def get_pagination_info(self) -> Dict:
         """Get current pagination information"""
         try:
@@ -748,13 +1598,38 @@ class DeviceScraper:
             self.log(f"[-] Error getting pagination info: {str(error)}")
             return {"current": 1, "total": 1}
 
+    async def select_specific_files(self, indices: List[int]) -> bool:
+        """Select hanya baris dengan index tertentu di halaman ini, baris lain di-uncheck
+        Args:
+            indices: Index baris (0-based) yang akan di-download
+        """
+        try:
+            self.log(f"[*] Selecting {len(indices)} files on this page: {indices}")
+            selected = await self.page.evaluate(_SELECT_ROWS_JS, indices)
+            if selected == len(indices):
+                self.log("[+] Files selected (verified)")
+                return True
+            self.log(f"[-] Only {selected}/{len(indices)} files selected")
+            return False
+        except Exception as error:
+            self.log(f"[-] Error selecting files: {str(error)}")
+            return False
+
+    def missing_row_indices(self, channel: int, table_data: List[Dict]) -> List[int]:
+        """Index baris tabel yang belum punya file di DB (match startTime)"""
+        start_times = self.get_downloaded_start_times(channel)
+        return [
+            index
+            for index, row in enumerate(table_data)
+            if _NON_DIGIT_RE.sub("", row["startTime"]) not in start_times
+        ]
+
     async def get_failed_file_indices(self) -> List[int]:
         """Get indices of files that are still checked (failed files remain checked)"""
         try:
             indices = await self.page.evaluate("""() => {
-                const rows = Array.from(
-                    document.querySelectorAll('div.td-table-body div.td-table-row')
-                );
+                // NodeList.forEach langsung, tanpa salin ke Array
+                const rows = document.querySelectorAll('div.td-table-body div.td-table-row');
                 const failedIndices = [];
                 rows.forEach((row, index) => {
                     const checkbox = row.querySelector('input.checkbox');
@@ -777,29 +1652,29 @@ class DeviceScraper:
         """Select all files on current page"""
         try:
             self.log("[*] Selecting all files on this page...")
-            await asyncio.sleep(0.5)
+            # Tunggu checkbox header ada, bukan sleep tetap
+            try:
+                await self.page.wait_for_selector("div.td-table-header input.checkbox", timeout=2000)
+            except PlaywrightTimeout:
+                self.log("[-] Checkbox not found")
+                return False
             # Coba klik sampai checked (maks 3x)
             for attempt in range(3):
-                checkbox_status = await self.page.evaluate("""() => {
-                    const checkbox = document.querySelector('div.td-table-header input.checkbox');
-                    if (!checkbox) return {found: false, checked: false};
-                    checkbox.click();
-                    return {found: true, checked: checkbox.checked};
-                }""")
+                # Klik header + verifikasi semua checkbox body dalam satu evaluate
+                checkbox_status = await self.page.evaluate(_SELECT_ALL_JS)
                 if not checkbox_status["found"]:
                     self.log("[-] Checkbox not found")
                     return False
-                # Verifikasi semua checkbox body checked
-                all_checked = await self.page.evaluate("""
-                () => {
-                    const checkboxes = document.querySelectorAll('div.td-table-body input.checkbox');
-                    return Array.from(checkboxes).length > 0 && Array.from(checkboxes).every(cb => cb.checked);
-                }
-                """)
-                if checkbox_status["checked"] and all_checked:
+                if checkbox_status["checked"] and checkbox_status["allChecked"]:
+                    self.log("[+] All files selected (verified)")
+                    return True
+                # UI mungkin update async: tunggu semua checked sebelum klik ulang
+                try:
+                    await self.page.wait_for_function(_ALL_CHECKED_JS, timeout=2000)
                     self.log("[+] All files selected (verified)")
                     return True
-                await asyncio.sleep(0.5)
+                except PlaywrightTimeout:
+                    pass
             self.log("[-] Failed to check select-all checkbox after retries or not all body checkboxes checked")
             return False
         except Exception as error:
@@ -816,137 +1691,104 @@ class DeviceScraper:
             # Reset current batch tracking
             self.current_download_batch = []
 
-            await self.click_xpath('//*[@id="playback_start_download"]')
-            await asyncio.sleep(1)
+            if not await self.click_id("playback_start_download"):
+                return False
+            # Tombol Stop muncul = DVR benar-benar memulai download; jika tidak, biar _retry mencoba lagi
+            try:
+                await self.page.wait_for_selector("#playback_down_stop:not([disabled])", timeout=5000)
+            except PlaywrightTimeout:
+                self.log("[-] Stop button did not appear, download not started")
+                return False
             self.log("[+] Download button clicked")
             return True
         except Exception as error:
             self.log(f"[-] Error starting download: {str(error)}")
             return False
 
-    async def wait_for_download_completion(self, timeout_ms: int = 600000) -> dict:
-        """Wait for download to complete, returns dict with success/failure count"""
+    async def wait_for_download_completion(
+        self, timeout_ms: int = 600000, expected_files: int = 0
+    ) -> dict:
+        """Wait for download to complete, returns dict with success/failure count
+        Args:
+            timeout_ms: Batas waktu total
+            expected_files: Jumlah file di halaman; jika > 0 selesai lebih awal
+                saat semua file batch sudah tertangani
+        """
         try:
             self.log("[*] Waiting for download to complete...")
-            start_time = asyncio.get_event_loop().time()
-            timeout_sec = timeout_ms / 1000
-
-            # Track initial state
-            initial_download_count = len(self.completed_downloads)
-            batch_start_count = len(self.current_download_batch)
+            # Bind clock loop sekali, dipakai di semua cek waktu di bawah
+            now = asyncio.get_running_loop().time
+            deadline = now() + timeout_ms / 1000
 
             # Wait initial delay
             await asyncio.sleep(2)
 
             last_progress = ""
-            no_change_count = 0
-            last_progress_time = asyncio.get_event_loop().time()
-            expected_files = 0
+            # Deadline stall: digeser maju setiap teks progress berubah
+            stall_deadline = now() + 60
+            page_files = expected_files
             result = {"success": 0, "failure": 0, "completed": False}
+            # Polling adaptif: 250ms setelah status berubah, melambat sampai 2s selama diam
+            poll_delay = 0.25
+            last_state = None
+
+            while now() < deadline:
+                # Semua file halaman ini sudah di-download/di-skip: tidak perlu parse alert,
+                # tapi tab baru bisa mulai download berikutnya setelah dialog selesai
+                if (
+                    page_files > 0
+                    and len(self.current_download_batch) >= page_files
+                    and not self.pending_downloads
+                ):
+                    self.log(f"[+] All {page_files} files of this page handled")
+                    try:
+                        await self.page.wait_for_function(
+                            _DL_IDLE_JS, timeout=max(deadline - now(), 1) * 1000
+                        )
+                    except PlaywrightTimeout:
+                        self.log("[!] Download dialog still busy after all files handled")
+                    result["success"] = len(self.current_download_batch)
+                    result["completed"] = True
+                    await self.save_downloaded_files_db(force_log=True)
+                    return result
 
-            while asyncio.get_event_loop().time() - start_time < timeout_sec:
-                # Check session masih valid
-                if not await self.check_session():
+                # Tunggu status dialog berubah (di-push observer) atau file selesai
+                try:
+                    await asyncio.wait_for(self._dl_status_changed.wait(), timeout=_jittered(poll_delay))
+                except asyncio.TimeoutError:
+                    pass
+                self._dl_status_changed.clear()
+
+                status = self._dl_status
+                if not status:
+                    # Observer belum terpasang (misal halaman belum reload)
+                    status = await self.page.evaluate(_DL_STATUS_JS)
+
+                # Check session masih valid: tanda login ikut di snapshot status (page.url
+                # lokal, tanpa round-trip); check_session penuh hanya jika tanda hilang
+                if (not status["loggedIn"] or "login" in self.page.url) and not await self.check_session():
                     self.log("[!] Session lost during download - aborting")
                     result["completed"] = False
                     return result
 
-                # Cek apakah tombol Stop Download disabled (indikator selesai)
-                stop_btn_disabled = await self.page.evaluate("""() => {
-                    const stopBtn = document.getElementById('playback_down_stop');
-                    return stopBtn && stopBtn.hasAttribute('disabled');
-                }""")
-                if stop_btn_disabled:
-                    self.log("[*] Tombol Stop Download disabled, proses download dianggap selesai. Cek notifikasi/toast...")
-                    # Tunggu sebentar untuk toast muncul
-                    await asyncio.sleep(1)
-                    toast_text = await self.page.evaluate("""() => {
-                        // Cek elemen toast/alert umum (contoh: element-plus/el-message)
-                        let toast = document.querySelector('.el-message__content');
-                        if (toast) return toast.textContent.trim();
-                        // Fallback ke showbox/info_ jika ada
-                        let showbox = document.getElementById('showbox');
-                        if (showbox && showbox.textContent.trim()) return showbox.textContent.trim();
-                        let info_ = document.getElementById('info_');
-                        if (info_ && info_.textContent.trim()) return info_.textContent.trim();
-                        return null;
-                    }""")
-                    if toast_text:
-                        self.log(f"[+] Notifikasi setelah tombol Stop Download disabled: {toast_text}")
-                        # Parse hasil download dari toast jika ada
-                        success_match = re.search(r"Success (\d+)", toast_text)
-                        failure_match = re.search(r"Failure (\d+)", toast_text)
-                        if success_match and failure_match:
-                            result["success"] = int(success_match.group(1))
-                            result["failure"] = int(failure_match.group(1))
-                        result["completed"] = True
-                        self.save_downloaded_files_db(force_log=True)
-                        return result
-                    else:
-                        self.log("[*] Tidak ada notifikasi/toast setelah tombol Stop Download disabled, anggap selesai")
-                        result["completed"] = True
-                        self.save_downloaded_files_db(force_log=True)
-                        return result
+                state = (status["infoText"], status["alertVisible"], len(self.current_download_batch))
+                poll_delay = 0.25 if state != last_state else min(poll_delay * 1.5, 2.0)
+                last_state = state
 
-                # Cek apakah dialog download masih ada
-                dialog_exists = await self.page.evaluate("""() => {
-                    const dialog = document.getElementById('playback_down_dialog');
-                    return !!(dialog && dialog.style.display !== 'none');
-                }""")
-                if not dialog_exists:
+                # Tombol Stop Download disabled atau dialog hilang = proses download selesai
+                if status["stopBtnDisabled"]:
+                    self.log("[*] Tombol Stop Download disabled, proses download dianggap selesai. Cek notifikasi/toast...")
+                    return await self._finish_from_toast(result, "tombol Stop Download disabled")
+                if not status["dialogVisible"]:
                     self.log("[*] Download dialog hilang, cek notifikasi/toast...")
-                    # Tunggu sebentar untuk toast muncul
-                    await asyncio.sleep(1)
-                    toast_text = await self.page.evaluate("""() => {
-                        // Cek elemen toast/alert umum (contoh: element-plus/el-message)
-                        let toast = document.querySelector('.el-message__content');
-                        if (toast) return toast.textContent.trim();
-                        // Fallback ke showbox/info_ jika ada
-                        let showbox = document.getElementById('showbox');
-                        if (showbox && showbox.textContent.trim()) return showbox.textContent.trim();
-                        let info_ = document.getElementById('info_');
-                        if (info_ && info_.textContent.trim()) return info_.textContent.trim();
-                        return null;
-                    }""")
-                    if toast_text:
-                        self.log(f"[+] Notifikasi setelah dialog hilang: {toast_text}")
-                        # Parse hasil download dari toast jika ada
-                        success_match = re.search(r"Success (\d+)", toast_text)
-                        failure_match = re.search(r"Failure (\d+)", toast_text)
-                        if success_match and failure_match:
-                            result["success"] = int(success_match.group(1))
-                            result["failure"] = int(failure_match.group(1))
-                        result["completed"] = True
-                        self.save_downloaded_files_db(force_log=True)
-                        return result
-                    else:
-                        self.log("[*] Tidak ada notifikasi/toast setelah dialog hilang, anggap selesai")
-                        result["completed"] = True
-                        self.save_downloaded_files_db(force_log=True)
-                        return result
-
-                status = await self.page.evaluate("""() => {
-                    const infoElem = document.getElementById('playback_down_info');
-                    const stopBtn = document.getElementById('playback_down_stop');
-                    const progressBar = document.getElementById('playback_down_progress');
-                    const alertElem = document.getElementById('info_');
-                    const showbox = document.getElementById('showbox');
-
-                    return {
-                        infoText: infoElem ? infoElem.textContent.trim() : null,
-                        stopBtnExists: stopBtn ? true : false,
-                        progressWidth: progressBar ? progressBar.style.width : null,
-                        alertVisible: alertElem ? alertElem.style.display !== 'none' : false,
-                        alertText: showbox ? showbox.textContent.trim() : null
-                    };
-                }""")
+                    return await self._finish_from_toast(result, "dialog hilang")
 
                 # Check for success alert
                 if status["alertVisible"] and status["alertText"]:
                     self.log(f"[+] Download alert: {status['alertText']}")
 
-                    success_match = re.search(r"Success (\d+)", status["alertText"])
-                    failure_match = re.search(r"Failure (\d+)", status["alertText"])
+                    success_match = _SUCCESS_RE.search(status["alertText"])
+                    failure_match = _FAILURE_RE.search(status["alertText"])
 
                     if success_match and failure_match:
                         success = int(success_match.group(1))
@@ -967,7 +1809,7 @@ class DeviceScraper:
                                     f"[+] All {len(self.current_download_batch)} files were already downloaded (skipped)"
                                 )
                                 # Save DB
-                                self.save_downloaded_files_db(force_log=True)
+                                await self.save_downloaded_files_db(force_log=True)
                                 return result
                         else:
                             self.log(
@@ -976,32 +1818,19 @@ class DeviceScraper:
 
                         # Wait for actual file downloads to complete
                         self.log("[*] Waiting for files to finish downloading...")
-                        for wait_count in range(60):  # Wait up to 60 seconds
-                            current_batch_downloads = len(self.current_download_batch)
-
-                            if (
-                                current_batch_downloads >= expected_files
-                                and len(self.pending_downloads) == 0
-                            ):
-                                self.log(
-                                    f"[+] All {current_batch_downloads} files downloaded successfully"
-                                )
-                                # Save DB setelah batch selesai
-                                self.save_downloaded_files_db(force_log=True)
-                                return result
-
-                            if wait_count % 5 == 0:  # Log every 5 seconds
-                                self.log(
-                                    f"[*] Downloaded {current_batch_downloads}/{expected_files} files, {len(self.pending_downloads)} pending"
-                                )
-
-                            await asyncio.sleep(1)
+                        if await self._wait_for_batch_files(expected_files, timeout=60, log_every=5):
+                            self.log(
+                                f"[+] All {len(self.current_download_batch)} files downloaded successfully"
+                            )
+                            # Save DB setelah batch selesai
+                            await self.save_downloaded_files_db(force_log=True)
+                            return result
 
                         self.log(
                             f"[+] Download completed with {len(self.current_download_batch)} files"
                         )
                         # Save DB
-                        self.save_downloaded_files_db(force_log=True)
+                        await self.save_downloaded_files_db(force_log=True)
                         return result
 
                 # Check progress text
@@ -1009,13 +1838,10 @@ class DeviceScraper:
                     if status["infoText"] != last_progress:
                         self.log(f"[*] {status['infoText']}")
                         last_progress = status["infoText"]
-                        no_change_count = 0
-                        last_progress_time = asyncio.get_event_loop().time()
-                    else:
-                        no_change_count += 1
+                        stall_deadline = now() + 60
 
                     # Parse progress
-                    match = re.search(r"\((\d+)/(\d+)\)", status["infoText"])
+                    match = _PROGRESS_RE.search(status["infoText"])
                     if match:
                         current = int(match.group(1))
                         total = int(match.group(2))
@@ -1026,28 +1852,21 @@ class DeviceScraper:
                             )
                             expected_files = total
 
-                            # Wait for alert
-                            for _ in range(60):
-                                alert_showing = await self.page.evaluate("""() => {
-                                    const alert = document.getElementById('info_');
-                                    return alert ? alert.style.display !== 'none' : false;
-                                }""")
+                            # Wait for alert (maks 60 detik, polling dengan backoff)
+                            alert_deadline = now() + 60
+                            alert_delay = 0.1
+                            while now() < alert_deadline:
+                                alert_status = await self.page.evaluate(_DL_STATUS_JS)
 
-                                if alert_showing:
+                                if alert_status["alertVisible"]:
                                     await asyncio.sleep(1)
-                                    result_text = await self.page.evaluate("""() => {
-                                        const showbox = document.getElementById('showbox');
-                                        return showbox ? showbox.textContent.trim() : null;
-                                    }""")
+                                    alert_status = await self.page.evaluate(_DL_STATUS_JS)
+                                    result_text = alert_status["alertText"] or ""
                                     self.log(f"[+] {result_text}")
 
                                     # Parse result
-                                    success_match = re.search(
-                                        r"Success (\d+)", result_text
-                                    )
-                                    failure_match = re.search(
-                                        r"Failure (\d+)", result_text
-                                    )
+                                    success_match = _SUCCESS_RE.search(result_text)
+                                    failure_match = _FAILURE_RE.search(result_text)
                                     if success_match and failure_match:
                                         result["success"] = int(success_match.group(1))
                                         result["failure"] = int(failure_match.group(1))
@@ -1055,167 +1874,552 @@ class DeviceScraper:
 
                                     break
 
-                                await asyncio.sleep(1)
+                                await asyncio.sleep(_jittered(alert_delay))
+                                alert_delay = min(alert_delay * 1.5, 2.0)
 
                             # Now wait for actual downloads
                             self.log("[*] Waiting for actual file downloads...")
-                            for wait_count in range(120):  # Wait up to 2 minutes
-                                current_batch_downloads = len(self.current_download_batch)
-
-                                if (
-                                    current_batch_downloads >= expected_files
-                                    and len(self.pending_downloads) == 0
-                                ):
-                                    self.log(
-                                        f"[+] All {current_batch_downloads} files downloaded successfully"
-                                    )
-                                    # Save DB dengan logging
-                                    self.save_downloaded_files_db(force_log=True)
-                                    return result
-
-                                if wait_count % 10 == 0:  # Log every 10 seconds
-                                    self.log(
-                                        f"[*] Downloaded {current_batch_downloads}/{expected_files} files, {len(self.pending_downloads)} pending"
-                                    )
-
-                                await asyncio.sleep(1)
+                            if await self._wait_for_batch_files(expected_files, timeout=120, log_every=10):
+                                self.log(
+                                    f"[+] All {len(self.current_download_batch)} files downloaded successfully"
+                                )
+                                # Save DB dengan logging
+                                await self.save_downloaded_files_db(force_log=True)
+                                return result
 
                             self.log(
                                 f"[+] Download finished with {len(self.current_download_batch)} files"
                             )
                             # Save DB
-                            self.save_downloaded_files_db(force_log=True)
+                            await self.save_downloaded_files_db(force_log=True)
                             return result
 
-                    # Check for stalled progress
-                    time_since_change = (
-                        asyncio.get_event_loop().time() - last_progress_time
-                    )
-                    if (
-                        no_change_count > 30
-                        and time_since_change > 60
-                        and not status["stopBtnExists"]
-                    ):
+                    # Check for stalled progress (berdasarkan waktu, jarak tick polling bervariasi)
+                    if now() > stall_deadline and not status["stopBtnExists"]:
                         self.log("[!] Download progress unchanged for 60s, completing")
                         result["completed"] = True
                         # Save DB
-                        self.save_downloaded_files_db(force_log=True)
+                        await self.save_downloaded_files_db(force_log=True)
                         return result
 
                 # Check if stop button disappeared
                 if not status["stopBtnExists"] and status["infoText"] is None:
                     self.log("[+] Download completed (stop button disappeared)")
-                    # Still wait a bit for downloads
-                    await asyncio.sleep(5)
+                    # Still wait a bit for downloads: selesai begitu semua file halaman
+                    # mendarat (event dari _handle_download), maks 5 detik
+                    if page_files > 0:
+                        await self._wait_for_batch_files(page_files, timeout=5, log_every=5)
+                    else:
+                        await asyncio.sleep(5)
                     result["completed"] = True
                     # Save DB
-                    self.save_downloaded_files_db(force_log=True)
+                    await self.save_downloaded_files_db(force_log=True)
                     return result
 
-                await asyncio.sleep(2)
-
             self.log("[-] Download timeout")
             result["completed"] = False
+            await self._abort_download_batch()
             # Save DB even on timeout
-            self.save_downloaded_files_db(force_log=True)
+            await self.save_downloaded_files_db(force_log=True)
             return result
         except Exception as error:
             self.log(f"[-] Error waiting for download completion: {str(error)}")
+            await self._abort_download_batch()
             # Save DB on error
-            self.save_downloaded_files_db(force_log=True)
+            await self.save_downloaded_files_db(force_log=True)
             return {"success": 0, "failure": 0, "completed": False}
+        finally:
+            # Pindahkan file batch ini ke folder channel
+            await self._flush_organize()
+
+    async def _finish_from_toast(self, result: dict, reason: str) -> dict:
+        """Baca notifikasi/toast setelah download selesai dan isi result
+        Args:
+            result: dict hasil wait_for_download_completion
+            reason: Penyebab download dianggap selesai (untuk log)
+        """
+        # Tunggu sebentar untuk toast muncul
+        await asyncio.sleep(1)
+        toast_text = (await self.page.evaluate(_DL_STATUS_JS))["toastText"]
+        if toast_text:
+            self.log(f"[+] Notifikasi setelah {reason}: {toast_text}")
+            # Parse hasil download dari toast jika ada
+            success_match = _SUCCESS_RE.search(toast_text)
+            failure_match = _FAILURE_RE.search(toast_text)
+            if success_match and failure_match:
+                result["success"] = int(success_match.group(1))
+                result["failure"] = int(failure_match.group(1))
+        else:
+            self.log(f"[*] Tidak ada notifikasi/toast setelah {reason}, anggap selesai")
+        result["completed"] = True
+        await self.save_downloaded_files_db(force_log=True)
+        return result
+
+    async def _wait_for_batch_files(
+        self, expected_files: int, timeout: float, log_every: float
+    ) -> bool:
+        """Tunggu semua file batch selesai di-download
+        Dibangunkan oleh _handle_download lewat _batch_changed, tanpa polling;
+        timeout tunggu hanya untuk log progress setiap log_every detik
+        Returns:
+            True jika semua file selesai sebelum timeout
+        """
+        now = asyncio.get_running_loop().time
+        deadline = now() + timeout
+        next_log = 0.0
+
+        while True:
+            # Clear sebelum cek, supaya perubahan sesudah cek tetap membangunkan wait
+            self._batch_changed.clear()
+            done, pending = len(self.current_download_batch), len(self.pending_downloads)
+            if done >= expected_files and pending == 0:
+                return True
+
+            remaining = deadline - now()
+            if remaining <= 0:
+                return False
+
+            if now() >= next_log:
+                self.log(f"[*] Downloaded {done}/{expected_files} files, {pending} pending")
+                next_log = now() + log_every
+
+            try:
+                await asyncio.wait_for(
+                    self._batch_changed.wait(), timeout=min(remaining, next_log - now())
+                )
+            except asyncio.TimeoutError:
+                pass
 
     async def close(self):
         """Close browser and cleanup"""
-        # Final save of download DB
-        self.save_downloaded_files_db(force_log=True)
+        await self._cancel_pending_downloads()
+        # Organize file yang masih tersisa + final save of download DB
+        await self._flush_organize()
+        if self._organizer:
+            # Sentinel: organizer menyelesaikan batch yang antri lalu berhenti
+            self._organize_queue.put_nowait(None)
+            await self._organizer
+            self._organizer = None
+        await self.save_downloaded_files_db(force_log=True)
+        self._db_journal.close()
 
         if self.browser:
             await self.browser.close()
             self.log("[+] Browser closed")
         if self.playwright:
             await self.playwright.stop()
+        if self._log_drainer:
+            # Sentinel: drainer menulis sisa antrian lalu berhenti
+            await self._log_queue.put(None)
+            await self._log_drainer
+            self._log_drainer = None
+        self.flush_log_queue()
         if self.log_stream:
+            # close() juga melakukan final flush
             self.log_stream.close()
 
     def get_download_stats(self):
-        """Get current download statistics"""
-        # Count total files in database
-        total_in_db = 0
-        for channel_data in self.downloaded_files_db_data["channels"].values():
-            for page_files in channel_data.get("pages", {}).values():
-                total_in_db += len(page_files)
-
+        """Get current download statistics (O(1), dari counter inkremental)"""
         return {
-            "completed": len(self.completed_downloads),
+            "completed": self.download_counts["completed"],
             "pending": len(self.pending_downloads),
-            "total_ever": total_in_db,
-            "files": self.completed_downloads,
+            "total_ever": self.download_counts["db_total"],
         }
 
     def check_file_exists(self, filename: str) -> bool:
         """Check if organized file already exists based on filename pattern"""
         try:
-            if not filename.endswith(".mp4"):
-                return False
+            target = _organized_target(filename)
+            return target is not None and self._organized_exists(*target)
+        except Exception as e:
+            return False
 
-            # Parse filename to get expected organized path
-            full_match = re.search(
-                r"\d+\.\d+\.\d+\.\d+_(\d+)_(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})_(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})\.mp4$",
-                filename,
+    def _channel_dir(self, channel_num: int) -> Path:
+        """Folder terorganisir untuk channel (Path di-cache per channel)"""
+        channel_dir = self._channel_dirs.get(channel_num)
+        if channel_dir is None:
+            channel_dir = self._channel_dirs[channel_num] = self.organized_dir / f"channel{channel_num}"
+        return channel_dir
+
+    def _organized_exists(self, channel_num: int, new_filename: str) -> bool:
+        """Cek file di folder channel, stat() hanya jika belum pernah terlihat"""
+        key = (channel_num, new_filename)
+        if key in self._organized_seen:
+            return True
+        if (self._channel_dir(channel_num) / new_filename).exists():
+            self._organized_seen.add(key)
+            return True
+        return False
+
+
+async def _retry(
+    scraper: DeviceScraper,
+    action: Callable[[], Awaitable[bool]],
+    label: str,
+    attempts: int = 3,
+    base_delay: float = 0.5,
+) -> bool:
+    """Jalankan action sampai berhasil (return True), backoff 0.5s, 1s, ...
+    Untuk kegagalan sementara (DOM belum siap, dialog belum tertutup)
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            if await action():
+                return True
+        except Exception as error:
+            scraper.log(f"[-] {label} error: {str(error)}")
+        if attempt < attempts:
+            delay = base_delay * (2 ** (attempt - 1))
+            scraper.log(f"[RETRY {attempt + 1}/{attempts}] {label} in {delay}s")
+            await asyncio.sleep(delay)
+    return False
+
+
+async def open_channel_query(
+    scraper: DeviceScraper, channel: Dict, start_date: str, end_date: str
+) -> bool:
+    """Select channel, set date range dan query playback di tab worker ini"""
+    # Tabel lama tidak valid lagi; query/halaman baru dicatat hanya jika query berhasil
+    scraper.current_query = None
+    scraper.ui_page = None
+    if not await scraper.select_channel(channel["value"]):
+        scraper.log(f"[-] Failed to select channel {channel['label']}")
+        return False
+
+    if not await scraper.set_date_range(start_date, end_date):
+        scraper.log(
+            f"[-] Failed to set date range untuk channel {channel['label']}"
+        )
+        return False
+
+    if not await scraper.query_playback():
+        scraper.log(
+            f"[-] Failed to query playback untuk channel {channel['label']}"
+        )
+        return False
+
+    scraper.current_query = (channel["value"], start_date, end_date)
+    scraper.ui_page = 1
+    return True
+
+
+async def query_channel_pages(
+    scraper: DeviceScraper, channel: Dict, start_date: str, end_date: str
+) -> Optional[Tuple[int, List[Tuple[int, Optional[List[Dict]]]], Optional[List[Dict]]]]:
+    """Query satu channel dan tentukan halaman yang masih perlu di-download
+    Returns:
+        (total halaman, [(page, table_data atau None jika belum ter-extract)],
+        semua baris tabel channel atau None jika tidak semua halaman ter-extract),
+        atau None jika query gagal
+    """
+    # Set current channel context
+    scraper.current_channel = channel["value"]
+
+    # Check session sebelum mulai channel baru
+    if not await scraper.check_session():
+        scraper.log("[!] Session lost before channel - re-logging in")
+        if not await scraper.re_login_and_resume(channel["value"], 1, start_date, end_date):
+            scraper.log("[-] Failed to resume, skipping channel")
+            return None
+    elif not await open_channel_query(scraper, channel, start_date, end_date):
+        return None
+
+    # Get pagination info
+    page_info = await scraper.get_pagination_info()
+    total_pages = page_info["total"]
+
+    # Ambil tabel semua halaman sekaligus; setelah ini UI ada di halaman terakhir
+    pages_data = await scraper.extract_all_pages(total_pages)
+    scraper.ui_page = len(pages_data) if len(pages_data) == total_pages else None
+
+    # File yang sudah ada di DB, dicocokkan per baris lewat waktu mulai
+    downloaded = scraper.get_downloaded_start_times(channel["value"])
+
+    pending_pages = []
+    for page in range(1, total_pages + 1):
+        # Check statistik page ini
+        page_stats = scraper.get_page_stats(channel["value"], page)
+        if page_stats["downloaded_count"] > 0:
+            scraper.log(
+                f"[*] Page {page} - Already downloaded {page_stats['downloaded_count']} files before"
             )
 
-            if not full_match:
+        # Tabel halaman ini sudah diambil di extract_all_pages
+        table_data = pages_data[page - 1] if page <= len(pages_data) else None
+        if table_data is not None:
+            if not table_data:
+                scraper.log(f"[*] No files found on page {page} of {total_pages}")
+                continue
+            if scraper.rows_downloaded(channel["value"], table_data, downloaded):
+                # Tidak perlu navigasi ke halaman yang sudah lengkap
+                scraper.log(f"[✓] Semua file di halaman {page} sudah di-download, lanjut ke page berikutnya")
+                continue
+
+        pending_pages.append((page, table_data))
+
+    all_rows = None
+    if len(pages_data) == total_pages:
+        all_rows = [row for table_data in pages_data for row in table_data]
+    return total_pages, pending_pages, all_rows
+
+
+async def process_page(
+    scraper: DeviceScraper,
+    channel: Dict,
+    page: int,
+    total_pages: int,
+    table_data: Optional[List[Dict]],
+    start_date: str,
+    end_date: str,
+) -> bool:
+    """Download satu halaman hasil query channel
+    Returns:
+        True jika semua file di halaman ini sudah ada di database
+    """
+    # Set current page context
+    scraper.set_page_context(channel["value"], page)
+
+    # Pastikan tab worker ini menampilkan query channel dan halaman yang benar
+    query = (channel["value"], start_date, end_date)
+    if not await scraper.check_session():
+        scraper.log(f"[!] Session lost at page {page} - re-logging in")
+        if not await scraper.re_login_and_resume(channel["value"], page, start_date, end_date):
+            scraper.log(f"[-] Failed to resume to page {page}, skipping page")
+            return False
+    else:
+        if scraper.current_query != query:
+            if not await open_channel_query(scraper, channel, start_date, end_date):
+                return False
+        if scraper.ui_page != page:
+            # Session OK, navigate page normally
+            scraper.log(f"[*] Navigasi ke halaman {page}...")
+            if not await scraper.jump_to_page(page):
+                scraper.current_query = None
+                scraper.ui_page = None
                 return False
+            scraper.ui_page = page
 
-            channel_num = int(full_match.group(1))
+    # Extract table data (jika belum didapat dari extract_all_pages)
+    if table_data is None:
+        table_data = await scraper.extract_table_data()
+    if table_data:
+        scraper.log(
+            f"\n[+] Found {len(table_data)} files on page {page} of {total_pages}"
+        )
+        if page == 1:
+            scraper.log("[*] Sample files:")
+            for idx, file in enumerate(islice(table_data, 3), 1):
+                scraper.log(
+                    f"    {idx}. {file['startTime']} -> {file['endTime']} ({file['type']})"
+                )
+    else:
+        scraper.log(
+            f"[*] No files found on page {page} of {total_pages}"
+        )
+        return True
+
+    # Cek jika semua baris di page sudah punya file di DB, skip retry
+    total_files_in_page = len(table_data)
+    if scraper.rows_downloaded(channel["value"], table_data):
+        scraper.log(f"[✓] Semua file di halaman {page} sudah ada di database, tidak perlu download atau retry.")
+        return True
+
+    # Retry logic: max 3 attempts per page
+    max_retries = 3
+    retry_count = 0
+
+    while retry_count < max_retries:
+        # Check session sebelum retry
+        if not await scraper.check_session():
+            scraper.log(f"[!] Session lost during page {page} processing - re-logging in")
+            if not await scraper.re_login_and_resume(channel["value"], page, start_date, end_date):
+                scraper.log(f"[-] Failed to resume, aborting page {page}")
+                break
+
+        # Hanya baris yang belum ada di DB yang dipilih, tidak download ulang satu halaman penuh
+        missing = scraper.missing_row_indices(channel["value"], table_data)
+        if not missing:
+            scraper.log(f"[✓] Semua file di halaman {page} sudah ada di database")
+            break
+
+        if retry_count > 0:
+            scraper.log(
+                f"\n[RETRY {retry_count + 1}/{max_retries}] Page {page} - Re-downloading {len(missing)} missing files"
+            )
+            # Delay lebih lama untuk retry (exponential backoff)
+            retry_delay = 5 * (2 ** (retry_count - 1))  # 5s, 10s, 20s
+            await asyncio.sleep(retry_delay)
+
+        if len(missing) == total_files_in_page:
+            # Select all and download
+            if retry_count == 0:
+                scraper.log(f"\n[*] Download semua file di halaman {page}...")
+            if not await _retry(scraper, scraper.select_all_files, "select all files"):
+                scraper.log("[-] Failed to select all files")
+                break
+        else:
+            scraper.log(f"\n[*] Download {len(missing)}/{total_files_in_page} file di halaman {page}...")
+            if not await _retry(
+                scraper, lambda: scraper.select_specific_files(missing), "select missing files"
+            ):
+                scraper.log("[-] Failed to select missing files")
+                break
+
+        if not await _retry(scraper, scraper.start_download, "start download"):
+            scraper.log("[-] Failed to start download")
+            break
+
+        # Wait for download completion (timeout sesuai jumlah file yang dipilih)
+        download_result = await scraper.wait_for_download_completion(
+            max(BASE_TIMEOUT_MS + PER_FILE_MS * len(missing), MIN_PAGE_TIMEOUT_MS), len(missing)
+        )
+
+        if not download_result["completed"]:
+            # Batch sudah dihentikan & dialog idle (_abort_download_batch), aman untuk retry
+            scraper.log(
+                f"[!] Download halaman {page} tidak selesai dalam timeout"
+            )
+            retry_count += 1
+            continue
+
+        # Setelah download, cek ulang baris yang masih belum punya file di database
+        still_missing = scraper.missing_row_indices(channel["value"], table_data)
+        if not still_missing:
+            scraper.log(
+                f"[✓] Semua file di halaman {page} sudah di-download atau sudah ada di database setelah percobaan ini, lanjut ke page berikutnya"
+            )
+            break
 
-            # Start time
-            start_year = full_match.group(2)
-            start_month = full_match.group(3)
-            start_day = full_match.group(4)
-            start_hour = full_match.group(5)
-            start_minute = full_match.group(6)
-            start_second = full_match.group(7)
+        # Jika masih ada file yang belum di-download, retry jika masih ada kesempatan
+        scraper.log(
+            f"[!] Page {page} masih ada {len(still_missing)} file yang belum di-download"
+        )
+        retry_count += 1
 
-            # Expected organized filename
-            date_str = f"{start_year}-{start_month}-{start_day}"
-            start_formatted = f"{start_hour}-{start_minute}-{start_second}"
-            expected_filename = f"{date_str}.{start_formatted}.mp4"
+        if retry_count < max_retries:
+            scraper.log(f"[*] Will retry (attempt {retry_count + 1}/{max_retries})...")
+            continue
+        else:
+            scraper.log(
+                f"[!] Max retries reached, skipping remaining failures"
+            )
+            break
+
+    # Files are organized per batch by wait_for_download_completion
+    stats = scraper.get_download_stats()
+    scraper.log(f"[*] Stats - Session: {stats['completed']}, Total ever: {stats['total_ever']}")
+
+    return scraper.rows_downloaded(channel["value"], table_data)
+
+
+async def _acquire_worker(pool: asyncio.Queue, query: Tuple[int, str, str]) -> DeviceScraper:
+    """Ambil worker idle dari pool, utamakan yang tabelnya sudah menampilkan query ini
+    (worker tersebut bisa langsung lompat halaman tanpa query ulang)
+    """
+    worker = await pool.get()
+    if worker.current_query == query:
+        return worker
+
+    idle = [pool.get_nowait() for _ in range(pool.qsize())]
+    for i, other in enumerate(idle):
+        if other.current_query == query:
+            idle[i], worker = worker, other
+            break
+    for other in idle:
+        pool.put_nowait(other)
+    return worker
+
+
+async def process_channel(
+    pool: asyncio.Queue, channel: Dict, start_date: str, end_date: str
+):
+    """Download semua halaman playback untuk satu channel
+
+    Halaman yang belum lengkap dibagi ke worker di pool sehingga beberapa
+    halaman di-download bersamaan.
+    """
+    worker = await pool.get()
+    try:
+        worker.log(f"\n[*] Memproses channel: {channel['label']}")
 
-            # Check if file exists in organized directory
-            channel_folder = self.organized_dir / f"channel{channel_num}"
-            expected_path = channel_folder / expected_filename
+        # Skip query jika channel ini sudah lengkap di run sebelumnya
+        if worker.is_query_cached(channel["value"], start_date, end_date):
+            worker.log(f"[✓] Channel {channel['label']} sudah lengkap (query cache), skip")
+            return
 
-            return expected_path.exists()
+        result = await query_channel_pages(worker, channel, start_date, end_date)
+    finally:
+        pool.put_nowait(worker)
 
-        except Exception as e:
+    if result is None:
+        return
+    total_pages, pending_pages, all_rows = result
+    query = (channel["value"], start_date, end_date)
+
+    async def run_page(page: int, table_data: Optional[List[Dict]]) -> bool:
+        page_worker = await _acquire_worker(pool, query)
+        try:
+            return await process_page(
+                page_worker, channel, page, total_pages, table_data, start_date, end_date
+            )
+        except Exception as error:
+            page_worker.log(f"[-] Error processing page {page} of {channel['label']}: {str(error)}")
             return False
+        finally:
+            pool.put_nowait(page_worker)
+
+    results = await asyncio.gather(
+        *(run_page(page, table_data) for page, table_data in pending_pages)
+    )
+
+    # Worker awal sudah kembali ke pool dan bisa dipakai channel lain,
+    # jadi bookkeeping memakai worker yang diambil ulang dari pool
+    worker = await pool.get()
+    try:
+        # Cache hanya jika semua baris channel terlihat (minimal satu) dan semuanya
+        # sudah ada di DB; hasil kosong/tidak lengkap di-query ulang pada run berikutnya
+        if (
+            all(results)
+            and all_rows
+            and worker.rows_downloaded(channel["value"], all_rows)
+        ):
+            await worker.record_query_cache(channel["value"], start_date, end_date)
+
+        worker.log(f"\n[+] Channel {channel['label']} selesai")
+    finally:
+        pool.put_nowait(worker)
 
 
 async def download_playback(scraper: DeviceScraper):
     """Main download playback flow"""
+    # Worker pool: scraper utama + worker dengan page sendiri di context yang sama
+    workers = [scraper]
     try:
         scraper.log("\n[*] === Starting Download Playback Flow ===\n")
 
-        # Get all channels
-        channels = await scraper.get_channel_list()
-        if not channels:
-            scraper.log("[-] No channels found")
-            return
+        # Active channels dari cache (maks 24 jam) atau scrape ulang
+        active_channels = scraper.load_channels_cache()
+        if active_channels is None:
+            # Get all channels
+            channels = await scraper.get_channel_list()
+            if not channels:
+                scraper.log("[-] No channels found")
+                return
 
-        # Filter active channels [1] through [21]
-        active_channels = []
-        for ch in channels:
-            match = re.match(r"^\[(\d+)\]", ch["label"])
-            if match:
-                num = int(match.group(1))
-                if 1 <= num <= 21:
-                    active_channels.append(ch)
+            # Filter active channels [1] through [21]
+            active_channels = []
+            for ch in channels:
+                match = _CH_LABEL_RE.match(ch["label"])
+                if match:
+                    num = int(match.group(1))
+                    if 1 <= num <= 21:
+                        active_channels.append(ch)
+
+            scraper.log(
+                f"[+] Active channels: {len(active_channels)} (filtered from {len(channels)})"
+            )
+            await scraper.save_channels_cache(active_channels)
 
-        scraper.log(
-            f"[+] Active channels: {len(active_channels)} (filtered from {len(channels)})"
-        )
         for ch in active_channels[:3]:
             scraper.log(f"    - Value: {ch['value']}, Label: {ch['label']}")
 
@@ -1228,228 +2432,90 @@ async def download_playback(scraper: DeviceScraper):
         # Set download date untuk database file
         scraper.set_download_date(date_str)
 
-        # Loop through all active channels
-        for channel in active_channels:
-            scraper.log(f"\n[*] Memproses channel: {channel['label']}")
-
-            # Set current channel context
-            scraper.current_channel = channel["value"]
-
-            # Check session sebelum mulai channel baru
-            if not await scraper.check_session():
-                scraper.log("[!] Session lost before channel - re-logging in")
-                if not await scraper.re_login_and_resume(channel["value"], 1, start_date, end_date):
-                    scraper.log("[-] Failed to resume, skipping channel")
-                    continue
-            else:
-                # Session OK, select channel normally
-                if not await scraper.select_channel(channel["value"]):
-                    scraper.log(f"[-] Failed to select channel {channel['label']}")
-                    continue
-
-                if not await scraper.set_date_range(start_date, end_date):
-                    scraper.log(
-                        f"[-] Failed to set date range untuk channel {channel['label']}"
-                    )
-                    continue
-
-                if not await scraper.query_playback():
-                    scraper.log(
-                        f"[-] Failed to query playback untuk channel {channel['label']}"
-                    )
-                    continue
-
-            # Get pagination info
-            page_info = await scraper.get_pagination_info()
-
-            for page in range(1, page_info["total"] + 1):
-                # Set current page context
-                scraper.current_page = page
-
-                # Check statistik page ini
-                page_stats = scraper.get_page_stats(channel["value"], page)
-                if page_stats["downloaded_count"] > 0:
-                    scraper.log(
-                        f"[*] Page {page} - Already downloaded {page_stats['downloaded_count']} files before"
-                    )
-
-                # Check session sebelum setiap page
-                if not await scraper.check_session():
-                    scraper.log(f"[!] Session lost at page {page} - re-logging in")
-                    if not await scraper.re_login_and_resume(channel["value"], page, start_date, end_date):
-                        scraper.log(f"[-] Failed to resume to page {page}, skipping rest of channel")
-                        break
-                else:
-                    # Session OK, navigate page normally (if not page 1)
-                    if page > 1:
-                        scraper.log(f"[*] Navigasi ke halaman {page}...")
-                        await scraper.page.evaluate(
-                            f"""(targetPage) => {{
-                            const input = document.getElementById('playback_jump_page');
-                            const btn = document.getElementById('playback_jump');
-                            if (input && btn) {{
-                                input.value = targetPage;
-                                btn.click();
-                            }}
-                        }}""",
-                            page,
-                        )
-                        await asyncio.sleep(2)
-
-                # Extract table data
-                table_data = await scraper.extract_table_data()
-                if table_data:
-                    scraper.log(
-                        f"\n[+] Found {len(table_data)} files on page {page} of {page_info['total']}"
-                    )
-                    if page == 1:
-                        scraper.log("[*] Sample files:")
-                        for idx, file in enumerate(table_data[:3]):
-                            scraper.log(
-                                f"    {idx + 1}. {file['startTime']} -> {file['endTime']} ({file['type']})"
-                            )
-                else:
-                    scraper.log(
-                        f"[*] No files found on page {page} of {page_info['total']}"
-                    )
-                    continue
-
-                # Cek jika semua file di page sudah di-download, skip retry dan lanjut ke page berikutnya
-                total_files_in_page = len(table_data)
-                already_downloaded_in_page = page_stats["downloaded_count"]
-                if total_files_in_page > 0 and already_downloaded_in_page == total_files_in_page:
-                    scraper.log(f"[✓] Semua file di halaman {page} sudah di-download, lanjut ke page berikutnya")
-                    continue
-
-                # Retry logic: max 3 attempts per page
-                max_retries = 3
-                retry_count = 0
-
-                # Hitung file yang benar-benar perlu di-download
-                files_to_download = total_files_in_page - already_downloaded_in_page
-
-                if files_to_download == 0:
-                    scraper.log(f"[✓] Semua file di halaman {page} sudah ada di database, tidak perlu download atau retry.")
-                    continue
-
-                while retry_count < max_retries:
-                    # Check session sebelum retry
-                    if not await scraper.check_session():
-                        scraper.log(f"[!] Session lost during page {page} processing - re-logging in")
-                        if not await scraper.re_login_and_resume(channel["value"], page, start_date, end_date):
-                            scraper.log(f"[-] Failed to resume, aborting page {page}")
-                            break
-
-                    if retry_count > 0:
-                        scraper.log(
-                            f"\n[RETRY {retry_count + 1}/{max_retries}] Page {page} - Re-downloading failed files"
-                        )
-                        scraper.log("[*] System will auto-skip files already in database")
-                        # Delay lebih lama untuk retry (exponential backoff)
-                        retry_delay = 5 * (2 ** (retry_count - 1))  # 5s, 10s, 20s
-                        await asyncio.sleep(retry_delay)
-
-                    # Select all and download
-                    if retry_count == 0:
-                        scraper.log(f"\n[*] Download semua file di halaman {page}...")
-
-                    if not await scraper.select_all_files():
-                        scraper.log("[-] Failed to select all files")
-                        break
-
-                    if not await scraper.start_download():
-                        scraper.log("[-] Failed to start download")
-                        break
-
-                    # Wait for download completion (10 minutes per page)
-                    download_result = await scraper.wait_for_download_completion(600000)
-
-                    if not download_result["completed"]:
-                        scraper.log(
-                            f"[!] Download halaman {page} tidak selesai dalam timeout"
-                        )
-                        break
-
-                    # Setelah download, cek ulang jumlah file yang sudah di database
-                    page_stats_after = scraper.get_page_stats(channel["value"], page)
-                    downloaded_now = page_stats_after["downloaded_count"] - already_downloaded_in_page
-
-                    # Hitung ulang file yang masih perlu di-download
-                    files_still_needed = total_files_in_page - page_stats_after["downloaded_count"]
+        for worker_id in range(1, CHANNEL_WORKERS):
+            worker = await scraper.spawn_worker(worker_id)
+            if not worker:
+                break
+            workers.append(worker)
+        scraper.log(f"[+] Processing channels with {len(workers)} worker(s)")
 
-                    # Jika sudah tidak ada file yang perlu di-download, break retry
-                    if files_still_needed == 0:
-                        scraper.log(
-                            f"[✓] Semua file di halaman {page} sudah di-download atau sudah ada di database setelah percobaan ini, lanjut ke page berikutnya"
-                        )
-                        break
-
-                    # Jika hasil success sama dengan file yang benar-benar baru, lanjut page
-                    if download_result["success"] >= downloaded_now:
-                        scraper.log(
-                            f"[✓] Semua file yang perlu di-download pada page {page} sudah berhasil diunduh"
-                        )
-                        break
+        pool: asyncio.Queue = asyncio.Queue()
+        for worker in workers:
+            pool.put_nowait(worker)
 
-                    # Jika masih ada file yang belum di-download, retry jika masih ada kesempatan
-                    scraper.log(
-                        f"[!] Page {page} masih ada {files_still_needed} file yang belum di-download"
-                    )
-                    retry_count += 1
+        channel_sem = asyncio.BoundedSemaphore(CHANNEL_CONCURRENCY)
 
-                    if retry_count < max_retries:
-                        scraper.log(f"[*] Will retry (attempt {retry_count + 1}/{max_retries})...")
-                        continue
-                    else:
-                        scraper.log(
-                            f"[!] Max retries reached, skipping remaining failures"
-                        )
-                        break
-
-                # Files are already organized in real-time by _handle_download
-                stats = scraper.get_download_stats()
-                scraper.log(f"[*] Stats - Session: {stats['completed']}, Total ever: {stats['total_ever']}")
-
-                # Pause sebelum lanjut ke page berikutnya
-                # await asyncio.get_event_loop().run_in_executor(None, input, f"Tekan ENTER untuk lanjut ke page berikutnya (Channel: {channel['label']}, Page: {page})...")
+        async def run_channel(channel: Dict):
+            async with channel_sem:
+                try:
+                    await process_channel(pool, channel, start_date, end_date)
+                except Exception as error:
+                    scraper.log(f"[-] Error processing channel {channel['label']}: {str(error)}")
 
-            scraper.log(f"\n[+] Channel {channel['label']} selesai")
+        # TaskGroup: jika main task di-cancel (CTRL+C) semua channel ikut di-cancel
+        async with asyncio.TaskGroup() as tg:
+            for channel in active_channels:
+                tg.create_task(run_channel(channel))
 
         scraper.log("\n[+] Download flow untuk semua channel selesai")
     except Exception as error:
         scraper.log(f"[-] Error in DownloadPlayback: {str(error)}")
+    finally:
+        # Juga saat error/cancel (CTRL+C): download worker di-cancel dan batch di-organize
+        for worker in workers[1:]:
+            try:
+                await worker.close_worker()
+            except Exception as error:
+                worker.log(f"[-] Error closing worker: {str(error)}")
 
 
 async def main():
     """Main entry point"""
     scraper = DeviceScraper("192.168.88.19")
 
-    # Setup signal handler for graceful shutdown
-    def signal_handler(sig, frame):
-        scraper.log("[!] SIGINT (CTRL+C) diterima, menutup browser...")
-        asyncio.create_task(scraper.close())
-        sys.exit(130)
-
-    signal.signal(signal.SIGINT, signal_handler)
+    # Setup signal handler for graceful shutdown (CTRL+C, juga kill/systemd/docker stop)
+    # Handler berjalan di event loop: cancel main task, cleanup di finally
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
+    received_signal: Optional[signal.Signals] = None
+
+    def request_shutdown(signum: signal.Signals):
+        nonlocal received_signal
+        if received_signal is not None:
+            # Signal kedua: cleanup kemungkinan hang, keluar paksa tanpa menunggu
+            print(f"[!] {signum.name} diterima lagi, keluar paksa", file=sys.stderr, flush=True)
+            os._exit(128 + signum)
+        received_signal = signum
+        scraper.log(f"[!] {signum.name} diterima, menutup browser...")
+        main_task.cancel()
+
+    shutdown_signals = (signal.SIGINT, signal.SIGTERM)
+    for signum in shutdown_signals:
+        loop.add_signal_handler(signum, request_shutdown, signum)
 
     try:
         await scraper.initialize()
 
         if await scraper.login("scrapper", "sc@10001"):
             scraper.log("[+] Authenticated")
-            await scraper.click_xpath('//*[@id="main_playback"]')
-            await asyncio.sleep(1.5)
-            await scraper.click_xpath('//*[@id="playback_new_download"]')
-            scraper.log("[*] Entering playback menu...")
-            await asyncio.sleep(1.5)
+            await scraper.open_playback_menu()
 
             await download_playback(scraper)
         else:
             scraper.log("[-] Authentication failed")
+    except asyncio.CancelledError:
+        if received_signal is None:
+            raise
     except Exception as error:
         scraper.log(f"[-] Unexpected error: {str(error)}")
     finally:
         await scraper.close()
+        for signum in shutdown_signals:
+            loop.remove_signal_handler(signum)
+
+    if received_signal is not None:
+        # Exit code konvensi shell: 128 + nomor signal (130 untuk SIGINT)
+        sys.exit(128 + received_signal)
 
 
 if __name__ == "__main__":